@@ -25,17 +25,15 @@ from institute.models.physical_processes import PDSMeasurement, Substrate, Solar
     SolarsimulatorCellMeasurement, Structuring
 from institute.models import SampleDetails, InformalLayer
 
-admin.site.register(ClusterToolDeposition)
-admin.site.register(ClusterToolHotWireLayer)
-admin.site.register(ClusterToolPECVDLayer)
-admin.site.register(FiveChamberDeposition)
-admin.site.register(FiveChamberLayer)
-
-admin.site.register(Substrate)
-admin.site.register(PDSMeasurement)
-admin.site.register(SolarsimulatorMeasurement)
-admin.site.register(SolarsimulatorCellMeasurement)
-admin.site.register(SampleDetails)
-
-admin.site.register(InformalLayer)
-admin.site.register(Structuring)
+
+class LayerAdmin(admin.ModelAdmin):
+    # The string representation of a layer contains its deposition.
+    list_select_related = ("deposition",)
+
+
+admin.site.register([ClusterToolDeposition, FiveChamberDeposition])
+admin.site.register([ClusterToolHotWireLayer, ClusterToolPECVDLayer, FiveChamberLayer], LayerAdmin)
+
+admin.site.register([Substrate, PDSMeasurement, SolarsimulatorMeasurement, SolarsimulatorCellMeasurement, SampleDetails])
+
+admin.site.register([InformalLayer, Structuring])
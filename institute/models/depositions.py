@@ -22,14 +22,13 @@
 themselves as well as models for layers.
 """
 
-from urllib.parse import quote_plus
 from django.utils.translation import gettext_lazy as _, gettext
-import django.urls
 from django.db import models
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Cast
 from jb_common import models as jb_common_models, model_fields
 from jb_common.utils.base import generate_permissions
 import samples.models.depositions
-from samples import permissions
 from samples.data_tree import DataItem
 
 
@@ -46,20 +45,13 @@ class ClusterToolDeposition(samples.models.Deposition):
     """
     carrier = models.CharField(_("carrier"), max_length=10, blank=True)
 
+    default_location_of_deposited_samples = _("cluster tool deposition lab")
+
     class Meta(samples.models.PhysicalProcess.Meta):
         verbose_name = _("cluster tool deposition")
         verbose_name_plural = _("cluster tool depositions")
         permissions = generate_permissions({"add", "change", "view_every", "edit_permissions"}, "ClusterToolDeposition")
 
-    def get_context_for_user(self, user, old_context):
-        context = old_context.copy()
-        if permissions.has_permission_to_add_physical_process(user, self.__class__):
-            context["duplicate_url"] = "{0}?copy_from={1}".format(
-                django.urls.reverse("institute:add_cluster_tool_deposition"), quote_plus(self.number))
-        else:
-            context["duplicate_url"] = None
-        return super().get_context_for_user(user, context)
-
     @classmethod
     def get_search_tree_node(cls):
         """Class method for generating the search tree node for this model
@@ -77,8 +69,6 @@ class ClusterToolDeposition(samples.models.Deposition):
         del model_field.related_models[ClusterToolLayer]
         return model_field
 
-samples.models.default_location_of_deposited_samples[ClusterToolDeposition] = _("cluster tool deposition lab")
-
 
 class ClusterToolLayer(samples.models.Layer, jb_common_models.PolymorphicModel):
     """Model for a layer of the “cluster tool”.  Note that this is the common
@@ -145,23 +135,13 @@ class ClusterToolPECVDLayer(ClusterToolLayer, ClusterToolHotWireAndPECVDGases):
 class FiveChamberDeposition(samples.models.Deposition):
     """5-chamber depositions.
     """
+    default_location_of_deposited_samples = _("5-chamber deposition lab")
+
     class Meta(samples.models.PhysicalProcess.Meta):
         verbose_name = _("5-chamber deposition")
         verbose_name_plural = _("5-chamber depositions")
         permissions = generate_permissions({"add", "change", "view_every", "edit_permissions"}, "FiveChamberDeposition")
 
-    def get_context_for_user(self, user, old_context):
-        context = old_context.copy()
-        if permissions.has_permission_to_add_physical_process(user, self.__class__):
-            context["duplicate_url"] = "{0}?copy_from={1}".format(
-                django.urls.reverse("institute:add_five_chamber_deposition"), quote_plus(self.number))
-        else:
-            context["duplicate_url"] = None
-        return super().get_context_for_user(user, context)
-
-
-samples.models.default_location_of_deposited_samples[FiveChamberDeposition] = _("5-chamber deposition lab")
-
 
 class FiveChamberLayer(samples.models.Layer):
     """One layer in a 5-chamber deposition.
@@ -197,16 +177,30 @@ class FiveChamberLayer(samples.models.Layer):
     def __str__(self):
         return _("layer {number} of {deposition}").format(number=self.number, deposition=self.deposition)
 
+    @classmethod
+    def get_export_queryset(cls):
+        # See `Layer.get_export_queryset` for the documentation.  The silane
+        # concentration is calculated by the database.
+        silane_normalized = 0.6 * Cast("sih4", models.FloatField())
+        return super().get_export_queryset().annotate(silane_concentration=Case(
+            When(Q(sih4__isnull=True) | Q(h2__isnull=True) | Q(sih4=0) | Q(h2=0), then=Value(0.0)),
+            default=silane_normalized / (silane_normalized + Cast("h2", models.FloatField())) * 100,
+            output_field=models.FloatField()))
+
     def get_data_for_table_export(self):
         # See `Layer.get_data_for_table_export` for the documentation.  This is
         # a good example for adding an additional field to the table output
         # which is not a field but calculated from fields.
         data_node = super().get_data_for_table_export()
-        if self.sih4 and self.h2:
-            silane_normalized = 0.6 * float(self.sih4)
-            silane_concentration = silane_normalized / (silane_normalized + float(self.h2)) * 100
-        else:
-            silane_concentration = 0
+        try:
+            silane_concentration = self.silane_concentration
+        except AttributeError:
+            # The layer was not fetched by `get_export_queryset`.
+            if self.sih4 and self.h2:
+                silane_normalized = 0.6 * float(self.sih4)
+                silane_concentration = silane_normalized / (silane_normalized + float(self.h2)) * 100
+            else:
+                silane_concentration = 0
         data_node.items.append(DataItem("SC/%", "{0:5.2f}".format(silane_concentration)))
         return data_node
 
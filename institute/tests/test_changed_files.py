@@ -18,7 +18,9 @@
 # this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import tempfile, os
+from unittest import mock
 from django.test import TestCase, override_settings
+from remote_client.jb_remote import crawler_tools
 from remote_client.jb_remote.crawler_tools import changed_files, find_changed_files, defer_files, Path
 from .tools import log
 
@@ -155,6 +157,22 @@ class ChangedFilesTest(Common, TestCase):
                 self.assertTrue(path.was_created)
                 self.assertFalse(path.was_modified)
 
+    def test_changed_content_same_mtime(self):
+        self.touch("1.dat", 1000000000)
+        self.assertEqual(self.find_changed_files(), ({"1.dat", "a.dat"}, set()))
+        with open(os.path.join(self.tempdir.name, "1.dat"), "w") as outfile:
+            outfile.write(".")
+        self.touch("1.dat", 1000000000)
+        self.assertEqual(self.find_changed_files(), ({"1.dat"}, set()))
+
+    def test_moved(self):
+        self.assertEqual(self.find_changed_files(), ({"1.dat", "a.dat"}, set()))
+        os.rename(os.path.join(self.tempdir.name, "1.dat"), os.path.join(self.tempdir.name, "2.dat"))
+        with mock.patch.object(crawler_tools, "_md5sum", wraps=crawler_tools._md5sum) as md5sum:
+            self.assertEqual(self.find_changed_files(), ({"2.dat"}, {"1.dat"}))
+        self.assertNotIn("2.dat", {self.relative(call.args[0]) for call in md5sum.call_args_list})
+        self.assertEqual(self.find_changed_files(), (set(), set()))
+
     def test_too_old_file(self):
         self.touch("1.dat", 0)
         with changed_files(self.tempdir.name, self.diff_file) as paths:
@@ -21,16 +21,27 @@
 import os
 from django.test import TestCase, override_settings
 from django.test.client import Client
-from django.contrib.auth.models import User
+from django.contrib.auth.models import User, Permission
+from django.contrib.contenttypes.models import ContentType
+from jb_common.models import Topic
+from samples import permissions
+import samples.models, samples.utils.views.forms
+import institute.models
 
 
 @override_settings(ROOT_URLCONF="institute.tests.urls")
 class MainFeaturesTest(TestCase):
     fixtures = ["test_main"]
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.get(username="juliabase")
+        assert cls.user.check_password("12345")
+
     def setUp(self):
+        # Password hashing is costly, so it is checked only once above.
         self.client = Client()
-        assert self.client.login(username="juliabase", password="12345")
+        self.client.force_login(self.user)
 
     def test_main_menu(self):
         response = self.client.get("/")
@@ -66,6 +77,8 @@ class MainFeaturesTest(TestCase):
     def test_advanced_search(self):
         response = self.client.get("/advanced_search")
         self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context["search_tree"])
+        self.assertFalse(response.context["search_performed"])
 
     def test_search_by_sample_name(self):
         response = self.client.get("/samples/")
@@ -148,6 +161,41 @@ class MainFeaturesTest(TestCase):
         self.assertEqual(response.status_code, 200)
 
 
+class PermissionsMemoTest(TestCase):
+    fixtures = ["test_main"]
+
+    def setUp(self):
+        # The test case's rollback sends no signals, so the memo must be reset
+        # explicitly.
+        self.addCleanup(permissions.forget_existing_permissions)
+
+    def test_new_permission(self):
+        user = User.objects.get(username="r.calvert")
+        process_class = institute.models.LayerThicknessMeasurement
+        self.assertTrue(permissions.has_permission_to_add_physical_process(user, process_class))
+        Permission.objects.create(codename="add_layerthicknessmeasurement", name="Can add layer thickness measurement",
+                                  content_type=ContentType.objects.get_for_model(process_class))
+        self.assertFalse(permissions.has_permission_to_add_physical_process(user, process_class))
+
+    def test_new_topic_membership(self):
+        user = User.objects.get(username="r.calvert")
+        topic = Topic.objects.exclude(members=user).first()
+        self.assertNotIn(topic.id, permissions.get_topic_ids(user))
+        user.topics.add(topic)
+        self.assertIn(topic.id, permissions.get_topic_ids(user))
+
+
+class MySamplesMemoTest(TestCase):
+    fixtures = ["test_main"]
+
+    def test_added_sample(self):
+        user = User.objects.get(username="r.calvert")
+        sample = samples.models.Sample.objects.exclude(watchers=user).first()
+        self.assertNotIn(sample, samples.utils.views.forms._get_my_samples(user))
+        user.my_samples.add(sample)
+        self.assertIn(sample, samples.utils.views.forms._get_my_samples(user))
+
+
 @override_settings(ROOT_URLCONF="institute.tests.urls")
 class AutoescapeTest(TestCase):
     fixtures = ["test_main"]
@@ -28,7 +28,7 @@ from django.utils.translation import gettext as _
 from django.forms.utils import ValidationError
 
 
-deposition_number_pattern = re.compile("\d\d[A-Z]-\d{3,4}$")
+deposition_number_pattern = re.compile(r"\d\d[A-Z]-\d{3,4}", re.ASCII)
 def clean_deposition_number_field(value, letter):
     """Checks wheter a deposition number given by the user in a form is a
     valid one.  Note that it does not check whether a deposition with this
@@ -50,15 +50,11 @@ def clean_deposition_number_field(value, letter):
     :raises ValidationError: if the deposition number was not a valid deposition
         number
     """
-    if not deposition_number_pattern.match(value):
+    if not deposition_number_pattern.fullmatch(value):
         # Translators: “YY” is year, “L” is letter, and “NNN” is number
         raise ValidationError(_("Invalid deposition number.  It must be of the form YYL-NNN."), code="invalid")
-    if isinstance(letter, list):
-        if value[2] not in letter:
-            raise ValidationError(_("The deposition letter must be an uppercase “%(letter)s”."),
-                                  params={"letter": ", ".join(letter)}, code="invalid")
-    else:
-        if value[2] != letter:
-            raise ValidationError(_("The deposition letter must be an uppercase “%(letter)s”."), params={"letter": letter},
-                                  code="invalid")
+    allowed_letters = letter if isinstance(letter, (list, tuple)) else (letter,)
+    if value[2] not in allowed_letters:
+        raise ValidationError(_("The deposition letter must be an uppercase “%(letter)s”."),
+                              params={"letter": ", ".join(allowed_letters)}, code="invalid")
     return value
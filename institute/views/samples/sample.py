@@ -170,7 +170,7 @@ def add_samples_to_database(add_samples_form, user):
         sample.processes.add(substrate)
         if cleaning_number:
             models.SampleAlias.objects.create(name=cleaning_number, sample=sample)
-        sample.watchers.add(user)
+        user.my_samples.add(sample)
         if topic:
             for watcher in (user_details.user for user_details in topic.auto_adders.all()):
                 watcher.my_samples.add(sample)
@@ -63,12 +63,13 @@ class JBCommonConfig(AppConfig):
         jb_menu.add(_("about"), reverse("samples:about"), "info-sign")
         if request.user.is_authenticated and request.method == "GET" and settings.LANGUAGES:
             jb_menu.add_separator()
+            back_url = request.path
+            if request.GET:
+                back_url += "?" + request.GET.urlencode()
+            back_url = urllib.parse.quote_plus(back_url)
+            switch_language_url = reverse("jb_common:switch_language")
             for code, name in settings.LANGUAGES:
-                back_url = request.path
-                if request.GET:
-                    back_url += "?" + request.GET.urlencode()
-                jb_menu.add(name, "{}?lang={}&amp;next={}".format(reverse("jb_common:switch_language"), code,
-                                                                  urllib.parse.quote_plus(back_url)),
+                jb_menu.add(name, "{}?lang={}&amp;next={}".format(switch_language_url, code, back_url),
                             icon_url=urllib.parse.urljoin(settings.STATIC_URL, "juliabase/flags/{}.png".format(code)),
                             icon_description=_("switch to {language}").format(language=name))
 
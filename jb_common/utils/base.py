@@ -18,7 +18,7 @@
 import codecs, re, os, os.path, time, datetime, copy, mimetypes, string, hashlib, urllib
 from io import BytesIO
 from contextlib import contextmanager
-from functools import wraps
+from functools import wraps, lru_cache
 from smtplib import SMTPException
 from functools import update_wrapper
 import django.http
@@ -844,10 +844,12 @@ def int_or_zero(number):
         return 0
 
 
+@lru_cache(maxsize=256)
 def camel_case_to_underscores(name):
     """Converts a CamelCase identifier to one using underscores.  For example,
     ``"MySamples"`` is converted to ``"my_samples"``, and ``"PDSMeasurement"``
-    to ``"pds_measurement"``.
+    to ``"pds_measurement"``.  Since it is mostly called with the names of the
+    few model classes, the results are cached.
 
     :param name: the camel-cased identifier
 
@@ -15,11 +15,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-import os, re, subprocess, time, smtplib, email, logging, pickle, contextlib, pathlib, itertools, socket, json
+import os, re, time, smtplib, email, logging, pickle, contextlib, pathlib, itertools, socket, json, hashlib, \
+    concurrent.futures, operator, functools
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import deprecation
 from . import settings
+if os.name == "posix":
+    import fcntl  # only available on Unix
 
 
 class Locked(Exception):
@@ -60,50 +63,40 @@ class PIDLock:
 
     def try_acquire_lock(self):
         my_hostname = socket.gethostname()
-        import fcntl  # local because only available on Unix
+        self.lockfile = open(os.open(self.lockfile_path, os.O_RDWR | os.O_CREAT), "r+")
         try:
-            self.lockfile = open(self.lockfile_path, "r+")
             fcntl.flock(self.lockfile.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-            hostname, pid = json.load(self.lockfile)
-        except FileNotFoundError:
-            self.lockfile = open(self.lockfile_path, "w")
-            try:
-                fcntl.flock(self.lockfile.fileno(), fcntl.LOCK_EX)
-                already_running = False
-            except BlockingIOError:
-                already_running = True
-                logging.warning("Lock {0} of other process active".format(self.lockfile_path))
         except BlockingIOError:
             already_running = True
             logging.warning("Lock {0} of other process active".format(self.lockfile_path))
-        except (ValueError, json.decoder.JSONDecodeError):
-            # Ignore invalid lock
-            already_running = False
-            self.lockfile.seek(0)
-            self.lockfile.truncate()
-            logging.warning("Lock {0} of other process has invalid content".format(self.lockfile_path))
         else:
-            if hostname == my_hostname:
+            already_running = False
+            content = self.lockfile.read()
+            if content:
                 try:
-                    os.kill(pid, 0)
-                except ProcessLookupError:
+                    hostname, pid = json.loads(content)
+                except ValueError:
                     # Ignore invalid lock
-                    already_running = False
-                    self.lockfile.seek(0)
-                    self.lockfile.truncate()
-                    logging.warning("Lock {0} of other process is orphaned".format(self.lockfile_path))
+                    logging.warning("Lock {0} of other process has invalid content".format(self.lockfile_path))
                 else:
-                    # sister process is already active
-                    already_running = True
-                    logging.warning("Lock {0} of other process active (but strangely not locked)".format(self.lockfile_path))
-            else:
-                # Assume container orchestration avoids cuncurrent processes
-                already_running = False
-                self.lockfile.seek(0)
-                self.lockfile.truncate()
-                logging.warning("Lock {0} of other process belongs to process on other host; assume it is orphaned".format(
-                    self.lockfile_path))
+                    if hostname != my_hostname:
+                        # Assume container orchestration avoids cuncurrent processes
+                        logging.warning("Lock {0} of other process belongs to process on other host; "
+                                        "assume it is orphaned".format(self.lockfile_path))
+                    else:
+                        try:
+                            os.kill(pid, 0)
+                        except ProcessLookupError:
+                            # Ignore invalid lock
+                            logging.warning("Lock {0} of other process is orphaned".format(self.lockfile_path))
+                        else:
+                            # sister process is already active
+                            already_running = True
+                            logging.warning("Lock {0} of other process active (but strangely not locked)".format(
+                                self.lockfile_path))
         if not already_running:
+            self.lockfile.seek(0)
+            self.lockfile.truncate()
             json.dump((my_hostname, os.getpid()), self.lockfile)
             self.lockfile.flush()
         else:
@@ -123,7 +116,6 @@ class PIDLock:
         return True
 
     def __exit__(self, type_, value, tb):
-        import fcntl
         fcntl.flock(self.lockfile.fileno(), fcntl.LOCK_UN)
         self.lockfile.close()
         os.remove(self.lockfile_path)
@@ -157,10 +149,15 @@ class Path:
 
     def __init__(self, root, relative_path, type_, mtime):
         self.relative_path = relative_path
-        self.path = pathlib.Path(root)/relative_path
+        self._path = os.path.join(root, relative_path)
         self.type_, self.mtime = type_, mtime
         self.done = False
 
+    @functools.cached_property
+    def path(self):
+        # Created only on demand because most paths are only used as strings.
+        return pathlib.Path(self._path)
+
     @property
     def was_changed(self):
         return self.type_ in {"modified", "created"}
@@ -186,16 +183,16 @@ class Path:
         self.done = True
 
     def __str__(self):
-        return str(self.path)
+        return self._path
 
     def __fspath__(self):
-        return str(self.path)
+        return self._path
 
     def __eq__(self, other):
-        return self.path == other.path
+        return self._path == other._path
 
     def __hash__(self):
-        return hash(self.path)
+        return hash(self._path)
 
     def __lt__(self, other):
         return self.mtime < other.mtime
@@ -245,69 +242,161 @@ class TrackingIterator:
             return current
 
 
+def _md5sum(filepath):
+    """Returns the MD5 checksum of a file, like the :command:`md5sum` program
+    does.  The file is read in blocks, so that large files are not read into
+    memory at once.  It is not memory-mapped because the file may be truncated
+    by the instrument still writing to it, which would kill the process with
+    SIGBUS.
+
+    :param filepath: path to the file
+
+    :type filepath: str
+
+    :returns:
+      the MD5 checksum as a hexadecimal string
+
+    :rtype: str
+    """
+    md5 = hashlib.md5()
+    with open(filepath, "rb") as file_:
+        for block in iter(lambda: file_.read(1024 * 1024), b""):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+def _md5sums(filepaths):
+    """Returns the MD5 checksums of many files.  The files are hashed in a
+    thread pool, so that reading and hashing them overlap.
+
+    :param filepaths: paths to the files
+
+    :type filepaths: list of str
+
+    :returns:
+      the MD5 checksums as hexadecimal strings, in the order of `filepaths`
+
+    :rtype: list of str
+    """
+    if len(filepaths) < 2:
+        return [_md5sum(filepath) for filepath in filepaths]
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        return list(executor.map(_md5sum, filepaths))
+
+
+def _scan_directory(dirname, relative_dirname=""):
+    """Yields all files in `dirname` and its subdirectories.  Like `os.walk`,
+    it does not follow symbolic links to directories, and it skips directories
+    that cannot be read.  This is a helper function for `_crawl_all`.
+
+    :param dirname: path to the directory to be scanned
+    :param relative_dirname: path of `dirname` relative to the root of the scan
+
+    :type dirname: str
+    :type relative_dirname: str
+
+    :returns:
+      iterator over the directory entries of all files, together with their
+      paths relative to the root of the scan
+
+    :rtype: iterator of (`os.DirEntry`, str)
+    """
+    try:
+        entries = os.scandir(dirname)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            relative_path = os.path.join(relative_dirname, entry.name)
+            try:
+                is_directory = entry.is_dir()
+            except OSError:
+                is_directory = False
+            if not is_directory:
+                yield entry, relative_path
+            elif not entry.is_symlink():
+                yield from _scan_directory(entry.path, relative_path)
+
+
 def _crawl_all(root, statuses, compiled_pattern):
     """Crawls through the `root` directory and scans for all files matching
     `compiled_pattern`.  This is a helper function for `changed_files`.  It
     creates data structures that document the found files.  In this function,
     “relative” path means relative to `root`.
 
+    Only files whose mtime, size, or inode number has changed are considered
+    as touched, i.e. only they need to be hashed.
+
     :param root: absolute root path of the files to be scanned
     :param statuses: Mapping of relative file paths to the current mtime of the
-      file, and its MD5 checksum.  It contains the content of the pickle file
-      as read as at the beginning of `changed_files`, or is empty.
+      file, its MD5 checksum, its size, and its inode number.  It contains the
+      content of the pickle file as read as at the beginning of
+      `changed_files`, or is empty.
     :param compiled_pattern: compiled regular expression for filenames (without
         path) that should be scanned.
 
     :type root: str
-    :type statuses: dict mapping str to (float, str)
+    :type statuses: dict mapping str to (float, str, int, int)
     :type compiled_pattern: ``_sre.SRE_Pattern``
 
     :returns:
-      all found relative paths, all new or mtime-changed absolute paths, and a
-      mapping of all new relative paths to (mtime, ``None``)
+      all found relative paths, all new or stat-changed absolute paths, and a
+      mapping of all new relative paths to (mtime, ``None``, size, inode)
 
-    :rtype: set of str, list of str, dict mapping str to (float, ``NoneType``)
+    :rtype: set of str, list of str, dict mapping str to (float, ``NoneType``,
+      int, int)
     """
     touched = []
     found = set()
     new_statuses = {}
-    for dirname, __, filenames in os.walk(root):
-        for filename in filenames:
-            if compiled_pattern.match(filename):
-                filepath = os.path.join(dirname, filename)
-                relative_filepath = os.path.relpath(filepath, root)
-                found.add(relative_filepath)
-                mtime = os.path.getmtime(filepath)
-                try:
-                    status = statuses[relative_filepath]
-                except KeyError:
-                    status = new_statuses[relative_filepath] = [None, None]
-                if mtime != status[0]:
-                    status[0] = mtime
-                    touched.append(filepath)
+    # The empty default pattern matches every filename.
+    match = compiled_pattern.match if compiled_pattern.pattern else None
+    for entry, relative_filepath in _scan_directory(root):
+        if match is None or match(entry.name):
+            found.add(relative_filepath)
+            stat_result = entry.stat()
+            mtime, size, inode = stat_result.st_mtime, stat_result.st_size, stat_result.st_ino
+            status = statuses.get(relative_filepath)
+            if status is None:
+                status = new_statuses[relative_filepath] = [None, None, None, None]
+            elif len(status) == 2:
+                # Written by an older version or by `find_changed_files`; only
+                # the mtime can be compared this time.
+                status.extend((size, inode))
+            if mtime != status[0] or size != status[2] or inode != status[3]:
+                status[0], status[2], status[3] = mtime, size, inode
+                touched.append(entry.path)
     return found, touched, new_statuses
 
-def _enrich_new_statuses(new_statuses, root, statuses, touched):
+def _enrich_new_statuses(new_statuses, root, statuses, touched, removed):
     """Adds MD5-changed files to `new_statuses`.  This is a helper function for
     `changed_files`.  Before calling this function, `new_statuses` only
     contains new files.  In this function, “relative” path means relative to
     `root`.
 
+    A new file with the same inode number, size, and mtime as a removed one has
+    only been moved, so it gets the checksum of the removed file instead of
+    being hashed.
+
     :param new_statuses: Mapping of relative file paths to the current mtime of
-      the file, and its MD5 checksum.  It is modified in place.  After this
-      function, it contains all files that are new or have changed content
-      (based on checksum).
+      the file, its MD5 checksum, its size, and its inode number.  It is
+      modified in place.  After this function, it contains all files that are
+      new or have changed content (based on checksum).
     :param root: absolute root path of the files to be scanned
     :param statuses: Mapping of relative file paths to the current mtime of the
-      file, and its MD5 checksum.  It contains the content of the pickle file
-      as read as at the beginning of `changed_files`, or is empty.
-    :param touched: list of all files which are new or have their mtime changed
-      since the last run (i.e., the last pickle file)
-
-    :type new_statuses: dict mapping str to (float, str)
+      file, its MD5 checksum, its size, and its inode number.  It contains the
+      content of the pickle file as read as at the beginning of
+      `changed_files`, or is empty.
+    :param touched: list of all files which are new or have their mtime, size,
+      or inode number changed since the last run (i.e., the last pickle file)
+    :param removed: relative paths of all files in `statuses` which were not
+      found anymore
+
+    :type new_statuses: dict mapping str to (float, str, int, int)
     :type root: str
-    :type statuses: dict mapping str to (float, str)
+    :type statuses: dict mapping str to (float, str, int, int)
     :type touched: list of str
+    :type removed: set of str
 
     :returns:
       all absolute paths which are new or have changed (checksum-wise) content,
@@ -315,26 +404,93 @@ def _enrich_new_statuses(new_statuses, root, statuses, touched):
 
     :rtype: list of str
     """
+    relative_filepaths = [os.path.relpath(filepath, root) for filepath in touched]
+    moved_md5sums = {}
+    for relative_filepath in removed:
+        status = statuses[relative_filepath]
+        if len(status) == 4:
+            mtime, md5sum, size, inode = status
+            moved_md5sums[mtime, size, inode] = md5sum
+    md5sums = {}
+    if moved_md5sums:
+        for filepath, relative_filepath in zip(touched, relative_filepaths):
+            new_status = new_statuses.get(relative_filepath)
+            if new_status:
+                md5sum = moved_md5sums.get((new_status[0], new_status[2], new_status[3]))
+                if md5sum:
+                    md5sums[filepath] = md5sum
+    to_be_hashed = [filepath for filepath in touched if filepath not in md5sums]
+    md5sums.update(zip(to_be_hashed, _md5sums(to_be_hashed)))
     changed = []
-    if touched:
-        xargs_process = subprocess.Popen(["xargs", "-0", "md5sum"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
-        xargs_output = xargs_process.communicate(b"\0".join(path.encode() for path in touched))[0]
-        if xargs_process.returncode != 0:
-            raise subprocess.CalledProcessError(xargs_process.returncode, "xargs")
-        for line in xargs_output.decode().splitlines():
-            md5sum, __, filepath = line.partition("  ")
-            relative_filepath = os.path.relpath(filepath, root)
-            status = statuses.get(relative_filepath)
-            if not status or md5sum != status[1]:
-                new_status = new_statuses.get(relative_filepath) or \
-                    new_statuses.setdefault(relative_filepath, statuses[relative_filepath].copy())
-                new_status[1] = md5sum
-                path = Path(root, relative_filepath, "modified" if status else "created", new_status[0])
-                changed.append(path)
-    assert set(changed) == {Path(root, path, "modified", 0) for path in new_statuses}, (set(changed), set(new_statuses))
-    changed.sort()
+    for filepath, relative_filepath in zip(touched, relative_filepaths):
+        md5sum = md5sums[filepath]
+        status = statuses.get(relative_filepath)
+        if not status or md5sum != status[1]:
+            new_status = new_statuses.get(relative_filepath) or \
+                new_statuses.setdefault(relative_filepath, statuses[relative_filepath].copy())
+            new_status[1] = md5sum
+            path = Path(root, relative_filepath, "modified" if status else "created", new_status[0])
+            changed.append(path)
+    assert {path.relative_path for path in changed} == new_statuses.keys(), \
+        ([path.relative_path for path in changed], set(new_statuses))
+    changed.sort(key=operator.attrgetter("mtime"))
     return changed
 
+
+def _load_statuses(diff_file, pattern, compiled_pattern):
+    """Reads the modification status of all files of the last run from the diff
+    file.  If the pattern has changed since then, files not matching the new
+    pattern are dropped.  This is a helper function for `changed_files` and
+    `find_changed_files`.
+
+    :param diff_file: path to the pickle file; it needn't exist
+    :param pattern: regular expression for filenames of the current run
+    :param compiled_pattern: compiled version of `pattern`
+
+    :type diff_file: str
+    :type pattern: str
+    :type compiled_pattern: ``_sre.SRE_Pattern``
+
+    :returns:
+      mapping of relative file paths to their status, and the pattern of the
+      last run; if there is no diff file yet, an empty mapping and ``None``
+
+    :rtype: dict mapping str to list, str or ``NoneType``
+    """
+    try:
+        with open(diff_file, "rb") as file_:
+            statuses, last_pattern = pickle.load(file_, encoding="utf-8")
+    except FileNotFoundError:
+        return {}, None
+    if last_pattern != pattern:
+        match = compiled_pattern.match
+        statuses = {relative_filepath: status for relative_filepath, status in statuses.items()
+                    if match(os.path.basename(relative_filepath))}
+    return statuses, last_pattern
+
+
+def _dump_statuses(diff_file, statuses, pattern):
+    """Writes the modification status of all files to the diff file.  The data
+    is written to a temporary file first, which then replaces the diff file.
+    This way, a crash while writing cannot leave a truncated diff file behind,
+    which would make the next run re-process all files.
+
+    :param diff_file: path to the pickle file
+    :param statuses: mapping of relative file paths to their status
+    :param pattern: regular expression for filenames of the current run
+
+    :type diff_file: str
+    :type statuses: dict mapping str to list
+    :type pattern: str
+    """
+    temporary_file = os.fspath(diff_file) + ".tmp"
+    with open(temporary_file, "wb") as file_:
+        pickle.dump((statuses, pattern), file_, pickle.HIGHEST_PROTOCOL)
+        file_.flush()
+        os.fsync(file_.fileno())
+    os.replace(temporary_file, diff_file)
+
+
 @contextlib.contextmanager
 def changed_files(root, diff_file, pattern=""):
     """Returns the files changed since the last run of this function.  The files
@@ -378,18 +534,11 @@ def changed_files(root, diff_file, pattern=""):
     :rtype: iterator of `Path`
     """
     compiled_pattern = re.compile(pattern, re.IGNORECASE)
-    if os.path.exists(diff_file):
-        statuses, last_pattern = pickle.load(open(diff_file, "rb"), encoding="utf-8")
-        if last_pattern != pattern:
-            for relative_filepath in [relative_filepath for relative_filepath in statuses
-                                      if not compiled_pattern.match(os.path.basename(relative_filepath))]:
-                del statuses[relative_filepath]
-    else:
-        statuses, last_pattern = {}, None
+    statuses, last_pattern = _load_statuses(diff_file, pattern, compiled_pattern)
 
     found, touched, new_statuses = _crawl_all(root, statuses, compiled_pattern)
-    changed = _enrich_new_statuses(new_statuses, root, statuses, touched)
     removed = set(statuses) - found
+    changed = _enrich_new_statuses(new_statuses, root, statuses, touched, removed)
     removed = [Path(root, relative_filepath, "removed", 0) for relative_filepath in removed]
 
     iterator = TrackingIterator(changed, removed)
@@ -414,7 +563,7 @@ def changed_files(root, diff_file, pattern=""):
             statuses[relative_path] = new_statuses[relative_path]
 
     if statuses_changed or last_pattern != pattern:
-        pickle.dump((statuses, pattern), open(diff_file, "wb"), pickle.HIGHEST_PROTOCOL)
+        _dump_statuses(diff_file, statuses, pattern)
 
 
 @deprecation.deprecated()
@@ -447,14 +596,7 @@ def find_changed_files(root, diff_file, pattern=""):
     :rtype: list of str, list of str
     """
     compiled_pattern = re.compile(pattern, re.IGNORECASE)
-    if os.path.exists(diff_file):
-        statuses, last_pattern = pickle.load(open(diff_file, "rb"), encoding="utf-8")
-        if last_pattern != pattern:
-            for relative_filepath in [relative_filepath for relative_filepath in statuses
-                                      if not compiled_pattern.match(os.path.basename(relative_filepath))]:
-                del statuses[relative_filepath]
-    else:
-        statuses, last_pattern = {}, None
+    statuses, last_pattern = _load_statuses(diff_file, pattern, compiled_pattern)
     touched = []
     found = set()
     for dirname, __, filenames in os.walk(root):
@@ -474,21 +616,15 @@ def find_changed_files(root, diff_file, pattern=""):
     removed = [os.path.join(root, relative_filepath) for relative_filepath in removed]
     changed = []
     timestamps = {}
-    if touched:
-        xargs_process = subprocess.Popen(["xargs", "-0", "md5sum"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
-        xargs_output = xargs_process.communicate(b"\0".join(path.encode() for path in touched))[0]
-        if xargs_process.returncode != 0:
-            raise subprocess.CalledProcessError(xargs_process.returncode, "xargs")
-        for line in xargs_output.decode().splitlines():
-            md5sum, __, filepath = line.partition("  ")
-            status = statuses[os.path.relpath(filepath, root)]
-            if md5sum != status[1]:
-                status[1] = md5sum
-                changed.append(filepath)
-                timestamps[filepath] = status[0]
+    for filepath, md5sum in zip(touched, _md5sums(touched)):
+        status = statuses[os.path.relpath(filepath, root)]
+        if md5sum != status[1]:
+            status[1] = md5sum
+            changed.append(filepath)
+            timestamps[filepath] = status[0]
     changed.sort(key=lambda filepath: timestamps[filepath])
     if touched or removed or last_pattern != pattern:
-        pickle.dump((statuses, pattern), open(diff_file, "wb"), pickle.HIGHEST_PROTOCOL)
+        _dump_statuses(diff_file, statuses, pattern)
     return changed, removed
 
 
@@ -515,12 +651,14 @@ def defer_files(diff_file, filepaths):
     :type diff_file: str
     :type filepaths: iterable of str
     """
-    statuses, pattern = pickle.load(open(diff_file, "rb"), encoding="utf-8")
+    with open(diff_file, "rb") as file_:
+        statuses, pattern = pickle.load(file_, encoding="utf-8")
     twelve_weeks_ago = time.time() - 12 * 7 * 24 * 3600
     for filepath in filepaths:
-        if filepath in statuses and statuses[filepath][0] > twelve_weeks_ago:
+        status = statuses.get(filepath)
+        if status and status[0] > twelve_weeks_ago:
             del statuses[filepath]
-    pickle.dump((statuses, pattern), open(diff_file, "wb"), pickle.HIGHEST_PROTOCOL)
+    _dump_statuses(diff_file, statuses, pattern)
 
 
 def send_error_mail(from_, subject, text, html=None):
@@ -538,24 +676,23 @@ def send_error_mail(from_, subject, text, html=None):
     :type text: str
     :type html: str
     """
+    message = MIMEMultipart()
+    message["Subject"] = subject
+    message["From"] = email.utils.formataddr((from_, settings.EMAIL_FROM))
+    message["To"] = settings.EMAIL_TO
+    message["Date"] = email.utils.formatdate()
+    message.attach(MIMEText(text, _charset="utf-8"))
+    if html:
+        message.attach(MIMEText(html, "html", _charset="utf-8"))
+    message = message.as_string()
     cycles = 5
     while cycles:
         try:
-            server = smtplib.SMTP(settings.SMTP_SERVER)
-            if settings.SMTP_LOGIN:
-                server.starttls()
-                server.login(settings.SMTP_LOGIN, settings.SMTP_PASSWORD)
-            message = MIMEMultipart()
-            message["Subject"] = subject
-            message["From"] = '"{0}" <{1}>'. \
-                format(from_.replace('"', ""), settings.EMAIL_FROM).encode("ascii", "replace")
-            message["To"] = settings.EMAIL_TO
-            message["Date"] = email.utils.formatdate()
-            message.attach(MIMEText(text.encode(), _charset="utf-8"))
-            if html:
-                message.attach(MIMEText(html.encode(), "html", _charset="utf-8"))
-            server.sendmail(settings.EMAIL_FROM, message["To"], message.as_string())
-            server.quit()
+            with smtplib.SMTP(settings.SMTP_SERVER) as server:
+                if settings.SMTP_LOGIN:
+                    server.starttls()
+                    server.login(settings.SMTP_LOGIN, settings.SMTP_PASSWORD)
+                server.sendmail(settings.EMAIL_FROM, settings.EMAIL_TO, message)
         except smtplib.SMTPException:
             pass
         else:
@@ -21,6 +21,14 @@ used e.g. for the CSV export of model instances.
 """
 
 from django.utils.functional import Promise
+from django.utils.translation import get_language
+
+
+_verbose_names = {}
+"""Cache for the translated verbose names of models.  It maps tuples of the
+form (model class, language) to the verbose name.  Otherwise, the lazy
+translation would have to be resolved for every single node.
+"""
 
 
 class DataNode:
@@ -61,7 +69,11 @@ class DataNode:
         if isinstance(instance, str):
             self.name = self.descriptive_name = instance
         else:
-            self.name = str(instance._meta.verbose_name)
+            key = (type(instance), get_language())
+            try:
+                self.name = _verbose_names[key]
+            except KeyError:
+                self.name = _verbose_names[key] = str(instance._meta.verbose_name)
         self.descriptive_name = str(descriptive_name) or self.name
         self.items = []
         self.children = []
@@ -110,9 +122,9 @@ class DataNode:
         groups base on the names created by ``find_unambiguous_names``.  In
         other words, if ``Nice result`` and ``Nice result #2`` don't share the
         same item keys, this is unimportant.  But if ``Nice result #2`` of two
-        samples in the exported series didn't share the same item keys, this
-        would result in a ``KeyError`` exception in
-        :py:meth:`samples.views.table_export.Column.get_value`.
+        samples in the exported series didn't share the same item keys, the
+        surplus items of the later sample would not get a column in the
+        table.
 
         This is not optimal for performance reasons.  But it is much easier
         than to train `build_column_group_list` to handle it.
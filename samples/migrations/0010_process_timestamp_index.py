@@ -0,0 +1,18 @@
+# Generated by Django 4.0.10 on 2026-10-15 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samples', '0009_auto_20200901_1457'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='process',
+            name='timestamp',
+            field=models.DateTimeField(db_index=True, verbose_name='timestamp'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.10 on 2026-10-15 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samples', '0010_process_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['process_class', 'status', 'last_modified'], name='samples_tas_process_cfd03d_idx'),
+        ),
+    ]
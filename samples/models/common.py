@@ -58,6 +58,46 @@ _table_export_blacklist = {"actual_object_id", "id", "content_type", "timestamp_
 """Set of field names that should never be included by `fields_to_data_items`.
 """
 
+_table_export_fields = {}
+"""Cache for `_get_table_export_fields`.  It maps tuples of the form (model
+class, blacklist, language) to the result of this function.
+"""
+
+def _get_table_export_fields(model, blacklist):
+    """Returns the fields of a model which are included in the table export,
+    together with their labels.  The result is cached per model, blacklist, and
+    language, so that the verbose names need not be translated and unescaped
+    again for every instance.
+
+    :param model: model class for which the fields should be returned
+    :param blacklist: field names that should not be returned
+
+    :type model: ``class``
+    :type blacklist: frozenset of str
+
+    :return:
+      the fields as tuples (field name, translated choices or ``None`` if the
+      field has no choices, label, origin of the resulting data item)
+
+    :rtype: list of (str, dict mapping ``object`` to str or NoneType, str, str)
+    """
+    key = (model, blacklist, get_language())
+    try:
+        return _table_export_fields[key]
+    except KeyError:
+        fields = []
+        for field in model._meta.fields:
+            if field.name not in blacklist and not field.name.endswith("_ptr"):
+                try:
+                    unit = "/" + field.unit
+                except AttributeError:
+                    unit = ""
+                choices = {value: str(label) for value, label in field.flatchoices} if field.choices else None
+                fields.append((field.name, choices, html.unescape(field.verbose_name + unit), field.model.__name__.lower()))
+        _table_export_fields[key] = fields
+        return fields
+
+
 def fields_to_data_items(instance, data_node, additional_blacklist=frozenset()):
     """Adds all fields of a model instance to the items of a data node.  This
     function is called inside :py:meth:`Process.get_data_for_table_export` in
@@ -73,20 +113,16 @@ def fields_to_data_items(instance, data_node, additional_blacklist=frozenset()):
     :type data_node: `samples.data_tree.DataNode`
     :type additional_blacklist: set of str
     """
-    blacklist = _table_export_blacklist | additional_blacklist
-    for field in instance._meta.fields:
-        if field.name not in blacklist and not field.name.endswith("_ptr"):
-            if field.choices:
-                value = getattr(instance, "get_{}_display".format(field.name))()
-            else:
-                value = getattr(instance, field.name)
-                if isinstance(value, django.contrib.auth.models.User):
-                    value = get_really_full_name(value)
-            try:
-                unit = "/" + field.unit
-            except AttributeError:
-                unit = ""
-            data_node.items.append(DataItem(html.unescape(field.verbose_name + unit), value, field.model.__name__.lower()))
+    def get_value(field_name, choices):
+        value = getattr(instance, field_name)
+        if choices is not None:
+            # This is what ``get_FOO_display()`` does, without translating the
+            # choices again for every instance.
+            return choices.get(value, value)
+        return get_really_full_name(value) if isinstance(value, django.contrib.auth.models.User) else value
+    blacklist = frozenset(_table_export_blacklist | additional_blacklist)
+    data_node.items.extend(DataItem(label, get_value(field_name, choices), origin)
+                           for field_name, choices, label, origin in _get_table_export_fields(type(instance), blacklist))
 
 
 def remove_data_item(instance, data_node, field_name):
@@ -174,7 +210,7 @@ class Process(PolymorphicModel):
         YEAR = 5, _("accurate to the year")
         NOT_EVEN_YEAR = 6, _("not even accurate to the year")
 
-    timestamp = models.DateTimeField(_("timestamp"))
+    timestamp = models.DateTimeField(_("timestamp"), db_index=True)
     timestamp_inaccuracy = models.PositiveSmallIntegerField(_("timestamp inaccuracy"), choices=TimestampInaccuracy.choices,
                                                             default=TimestampInaccuracy.TOTAL)
     operator = models.ForeignKey(django.contrib.auth.models.User, on_delete=models.CASCADE, verbose_name=_("operator"),
@@ -432,7 +468,11 @@ class Process(PolymorphicModel):
 
     @classmethod
     def get_lab_notebook_context(cls, year, month):
-        processes = cls.objects.filter(timestamp__year=year, timestamp__month=month).select_related()
+        # A range instead of ``timestamp__month`` lets the database use the
+        # index of ``timestamp``.
+        begin = django.utils.timezone.make_aware(datetime.datetime(year, month, 1))
+        end = django.utils.timezone.make_aware(datetime.datetime(year + month // 12, month % 12 + 1, 1))
+        processes = cls.objects.filter(timestamp__gte=begin, timestamp__lt=end).select_related()
         return {"processes": processes}
 
     def get_cache_key(self, user_settings_hash, local_context):
@@ -656,19 +696,67 @@ class PhysicalProcess(Process):
         ordering = ["timestamp"]
         get_latest_by = "timestamp"
 
+    _url_names = {}
+    """Cache for `_urlresolve`.  It maps tuples of the form (process class, URL
+    prefix, URL configuration) to tuples (URL name, keyword argument name) of
+    the URL pattern which was found to work.  Only successful lookups are
+    cached because whether a pattern matches may depend on the value of the
+    identifying field.
+    """
+
     def _urlresolve(self, prefix):
-        prefix = self._meta.app_label + ":" + prefix
-        class_name = camel_case_to_underscores(self.__class__.__name__)
+        key = (self.__class__, prefix, django.urls.get_urlconf() or settings.ROOT_URLCONF)
         try:
-            field_name = parameter_name = self.JBMeta.identifying_field
+            field_name = self.JBMeta.identifying_field
         except AttributeError:
-            field_name, parameter_name = "id", class_name + "_id"
+            field_name = "id"
         # Quote it in order to allow slashs in values.
         field_value = quote(str(getattr(self, field_name)), safe="")
         try:
-            return django.urls.reverse(prefix + class_name, kwargs={parameter_name: field_value})
-        except django.urls.NoReverseMatch:
-            return django.urls.reverse(prefix + class_name, kwargs={"process_id": field_value})
+            url_name, parameter_name = self._url_names[key]
+        except KeyError:
+            pass
+        else:
+            try:
+                return django.urls.reverse(url_name, kwargs={parameter_name: field_value})
+            except django.urls.NoReverseMatch:
+                pass
+        url_name, parameter_name, url = self._find_url_name(prefix, field_value)
+        self._url_names[key] = url_name, parameter_name
+        return url
+
+    def _find_url_name(self, prefix, field_value):
+        """Finds the URL pattern for `_urlresolve`.
+
+        :param prefix: the prefix of the URL name, e.g. ``"show_"``
+        :param field_value: the value of the identifying field, already quoted
+
+        :type prefix: str
+        :type field_value: str
+
+        :return:
+          the URL name, the name of its keyword argument, and the URL for
+          `field_value`
+
+        :rtype: str, str, str
+
+        :raises django.urls.NoReverseMatch: if there is no matching URL
+            pattern
+        """
+        prefix = self._meta.app_label + ":" + prefix
+        class_name = camel_case_to_underscores(self.__class__.__name__)
+        try:
+            parameter_name = self.JBMeta.identifying_field
+        except AttributeError:
+            parameter_name = class_name + "_id"
+        for parameter_name in (parameter_name, "process_id"):
+            try:
+                url = django.urls.reverse(prefix + class_name, kwargs={parameter_name: field_value})
+            except django.urls.NoReverseMatch:
+                pass
+            else:
+                return prefix + class_name, parameter_name, url
+        raise django.urls.NoReverseMatch("No URL pattern for {} and prefix {!r}".format(self.__class__.__name__, prefix))
 
     def get_absolute_url(self):
         try:
@@ -709,6 +797,12 @@ class PhysicalProcess(Process):
         except django.urls.NoReverseMatch:
             return None
 
+    lab_notebook_chunk_size = 500
+    """Number of processes which are fetched from the database at once when
+    generating the lab notebook data.  It bounds the memory consumption for
+    months with many processes.
+    """
+
     @classmethod
     def get_lab_notebook_data(cls, year, month):
         """Returns the data tree for all processes in the given month.  This
@@ -717,7 +811,8 @@ class PhysicalProcess(Process):
         """
         measurements = cls.get_lab_notebook_context(year, month)["processes"]
         data = DataNode(_("lab notebook for {process_name}").format(process_name=cls._meta.verbose_name_plural))
-        data.children.extend(measurement.get_data_for_table_export() for measurement in measurements)
+        data.children.extend(measurement.get_data_for_table_export()
+                             for measurement in measurements.iterator(chunk_size=cls.lab_notebook_chunk_size))
         return data
 
     def delete(self, *args, **kwargs):
@@ -1393,10 +1488,10 @@ class Result(Process):
             for i, value_list in enumerate(value_lists):
                 # Translators: In a table
                 child_node = DataNode(_("row"), _("row #{number}").format(number=i + 1))
-                child_node.items = [DataItem(quantities[j], value) for j, value in enumerate(value_list)]
+                child_node.items = [DataItem(quantity, value) for quantity, value in zip(quantities, value_list)]
                 data_node.children.append(child_node)
         elif len(value_lists) == 1:
-            data_node.items.extend([DataItem(quantity, value) for quantity, value in zip(quantities, value_lists[0])])
+            data_node.items.extend(DataItem(quantity, value) for quantity, value in zip(quantities, value_lists[0]))
         return data_node
 
     def delete(self, *args, **kwargs):
@@ -1704,6 +1799,7 @@ class Task(models.Model):
     class Meta:
         verbose_name = _("task")
         verbose_name_plural = _("tasks")
+        indexes = [models.Index(fields=["process_class", "status", "last_modified"])]
 
     def __str__(self):
         return _("task of {process_class} from {datetime}". format(
@@ -17,26 +17,18 @@
 
 """Models for depositions.  This includes the deposition models themselves as
 well as models for layers.
-
-:type default_location_of_deposited_samples: dict mapping `Deposition` to
-  string.
 """
 
+from urllib.parse import quote_plus
 from django.utils.translation import gettext_lazy as _, gettext
 from django.db import models
 from jb_common import search
+from jb_common.models import PolymorphicModel
+import samples.permissions
 from samples.models import PhysicalProcess, fields_to_data_items, remove_data_item
 from samples.data_tree import DataNode, DataItem
 
 
-default_location_of_deposited_samples = {}
-"""Dictionary mapping process classes to strings which contain the default
-location where samples can be found after this process has been performed.
-This is used in
-:py:meth:`samples.views.split_after_deposition.GlobalNewDataForm.__init__`.
-"""
-
-
 class Deposition(PhysicalProcess):
     """The base class for deposition processes.  Note that, like
     `~samples.models.Process`, this must never be instantiated.  Instead,
@@ -56,6 +48,12 @@ class Deposition(PhysicalProcess):
     number = models.CharField(_("deposition number"), max_length=15, unique=True, db_index=True)
     split_done = models.BooleanField(_("split after deposition done"), default=False)
 
+    default_location_of_deposited_samples = ""
+    """Default location where samples can be found after this deposition has
+    been performed.  Override it in derived classes.  This is used in
+    :py:meth:`samples.views.split_after_deposition.GlobalNewDataForm.__init__`.
+    """
+
     class Meta(PhysicalProcess.Meta):
         verbose_name = _("deposition")
         verbose_name_plural = _("depositions")
@@ -73,6 +71,41 @@ class Deposition(PhysicalProcess):
         """
         return self.layers
 
+    def get_context_for_user(self, user, old_context):
+        # The duplication link points to the add view with the deposition
+        # number as a parameter.
+        context = old_context.copy()
+        add_link = self.get_add_link() if self._has_permission_to_add(user) else None
+        context["duplicate_url"] = "{0}?copy_from={1}".format(add_link, quote_plus(self.number)) if add_link else None
+        return super().get_context_for_user(user, context)
+
+    @classmethod
+    def _has_permission_to_add(cls, user):
+        """Returns whether the user is allowed to add depositions of this class.
+        The result is memoized in the user instance, so that e.g. the
+        duplication links of a long list of depositions don't require a
+        permission lookup each.  Since ``request.user`` lives only as long as
+        the request, so does the memoized result.
+
+        :param user: the user whose permission should be checked
+
+        :type user: django.contrib.auth.models.User
+
+        :return:
+          whether the user can add depositions of this class
+
+        :rtype: bool
+        """
+        try:
+            cache = user._deposition_add_permission_cache
+        except AttributeError:
+            cache = user._deposition_add_permission_cache = {}
+        try:
+            return cache[cls]
+        except KeyError:
+            result = cache[cls] = samples.permissions.has_permission_to_add_physical_process(user, cls)
+            return result
+
     def _get_layers(self):
         """Retrieves all layers of this deposition.  This function can deal with
         polymorphic layer classes as well as with the possibility that the
@@ -84,12 +117,12 @@ class Deposition(PhysicalProcess):
         :rtype: list of `Layer`.
         """
         layers = []
-        try:
-            all_layers = self.layers.all()
-        except AttributeError:
-            pass
-        else:
-            for layer in all_layers:
+        lookups = self._get_layers_prefetch_lookups()
+        if lookups:
+            # This is a no-op if the layers were prefetched already, e.g. in
+            # `get_lab_notebook_context`.
+            models.prefetch_related_objects([self], *lookups)
+            for layer in self.layers.all():
                 try:
                     # For deposition systems with polymorphic layers
                     layer = layer.actual_instance
@@ -98,6 +131,31 @@ class Deposition(PhysicalProcess):
                 layers.append(layer)
         return layers
 
+    @classmethod
+    def _get_layers_prefetch_lookups(cls):
+        """Returns the lookups needed to fetch all layers of depositions of
+        this class, including their actual instances in case of polymorphic
+        layers, with a constant number of queries.
+
+        For polymorphic layers, only those columns of the common base layer
+        model are fetched which are needed to find the actual instances.
+
+        :return:
+          the lookups to be passed to ``prefetch_related``; it is empty if this
+          deposition class doesn't have layers
+
+        :rtype: list of (str or ``django.db.models.Prefetch``)
+        """
+        try:
+            layer_class = cls.layers.rel.related_model
+        except AttributeError:
+            return []
+        if issubclass(layer_class, PolymorphicModel):
+            base_layers = layer_class.objects.only("deposition", "content_type", "actual_object_id")
+            return [models.Prefetch("layers", queryset=base_layers), "layers__actual_instance"]
+        else:
+            return [models.Prefetch("layers", queryset=layer_class.get_export_queryset())]
+
     def get_data(self):
         """Extract the data of the deposition as a dictionary, ready to be used for
         general data export.  In contrast to `get_data_for_table_export`, I
@@ -127,10 +185,36 @@ class Deposition(PhysicalProcess):
         # See `Process.get_data_for_table_export` for the documentation.
         data_node = super().get_data_for_table_export()
         remove_data_item(self, data_node, "split_done")
-        for layer in self._get_layers():
-            data_node.children.append(layer.get_data_for_table_export())
+        data_node.children.extend(layer.get_data_for_table_export() for layer in self._get_layers())
         return data_node
 
+    @classmethod
+    def get_lab_notebook_context(cls, year, month):
+        # Both the lab notebook templates and `get_lab_notebook_data` walk
+        # through all layers of all depositions of the month.
+        context = super().get_lab_notebook_context(year, month)
+        context["processes"] = context["processes"].prefetch_related(*cls._get_layers_prefetch_lookups())
+        return context
+
+    @classmethod
+    def get_lab_notebook_data(cls, year, month):
+        # ``iterator()`` ignores ``prefetch_related`` before Django 4.1.
+        # Therefore, the depositions are fetched chunk-wise, and the layers
+        # are prefetched for each chunk separately.
+        depositions = cls.get_lab_notebook_context(year, month)["processes"].prefetch_related(None)
+        lookups = cls._get_layers_prefetch_lookups()
+        data = DataNode(_("lab notebook for {process_name}").format(process_name=cls._meta.verbose_name_plural))
+        chunk = []
+        for deposition in depositions.iterator(chunk_size=cls.lab_notebook_chunk_size):
+            chunk.append(deposition)
+            if len(chunk) == cls.lab_notebook_chunk_size:
+                models.prefetch_related_objects(chunk, *lookups)
+                data.children.extend(deposition.get_data_for_table_export() for deposition in chunk)
+                chunk = []
+        models.prefetch_related_objects(chunk, *lookups)
+        data.children.extend(deposition.get_data_for_table_export() for deposition in chunk)
+        return data
+
     @classmethod
     def get_search_tree_node(cls):
         """Class method for generating the search tree node for this model
@@ -191,11 +275,29 @@ class Layer(models.Model):
         You will rarely need to override this method in derived layer classes.
 
         :return:
-          the content of all fields of this layer
+          the content of all fields of this layer; the deposition and parent
+          links are given as primary keys so that they don't need to be fetched
+          from the database
 
         :rtype: `dict`
         """
-        return {field.name: getattr(self, field.name) for field in self._meta.fields}
+        return {field.name: getattr(self, field.attname if field.name == "deposition" or field.name.endswith("_ptr")
+                                    else field.name)
+                for field in self._meta.fields}
+
+    @classmethod
+    def get_export_queryset(cls):
+        """Returns the query set used for fetching the layers of depositions in
+        bulk, e.g. for the lab notebook or the data export.  Override this in
+        derived layer classes in order to let the database compute derived
+        values with ``annotate``.
+
+        :return:
+          all layers of this class
+
+        :rtype: ``django.db.models.query.QuerySet``
+        """
+        return cls.objects.all()
 
     def get_data_for_table_export(self):
         # See `Process.get_data_for_table_export` for the documentation.
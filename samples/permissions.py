@@ -18,8 +18,8 @@
 """Central permission checking.  This module consists of three parts: First,
 the exception that is raised if a certain permission condition is not met.
 Secondly, the assertion functions that test for certain permissions.  And
-thirdly, top-level code that generates a ``has_permission_to_...`` function for
-every ``assert_can_...`` function.
+thirdly, a ``has_permission_to_...`` function for every ``assert_can_...``
+function.
 
 The idea is the following.  For example, there is a function called
 ``assert_can_fully_view_sample``.  If the user can't view the sample, a
@@ -35,7 +35,7 @@ permission just means that e.g. a link is not generated (for example, in the
 ``get_context_for_user`` methods in the models).
 """
 
-import hashlib, re
+import hashlib, re, functools
 from django.db.models import Q
 from django.contrib.contenttypes.models import ContentType
 import django.urls
@@ -51,6 +51,12 @@ from samples.utils.sample_name_formats import sample_name_format, get_renamable_
 _permission_name_regex = re.compile("(?P<prefix>Can (?:add|edit every|view every|edit permissions for) )'(?P<class_name>.+)'",
                                     re.UNICODE)
 
+_permission_names = {}
+"""Cache for the untranslated names of permissions, mapping codenames (without
+the app label) to names.  Permissions don't change while JuliaBase is running,
+so there is no need to look them up again.
+"""
+
 def translate_permission(permission_codename):
     """Translates a permission description to the user's language.  Note that in
     order to uniquely identify a permission, the model is needed, too.  This is
@@ -72,16 +78,71 @@ def translate_permission(permission_codename):
     """
     permission_codename = permission_codename.partition(".")[2]
     try:
-        name = Permission.objects.filter(codename=permission_codename)[0].name
-    except IndexError:
-        return _("[not available]")
+        name = _permission_names[permission_codename]
+    except KeyError:
+        try:
+            name = _permission_names[permission_codename] = \
+                Permission.objects.filter(codename=permission_codename)[0].name
+        except IndexError:
+            return _("[not available]")
+    return _translate_permission_name(name)
+
+
+def _translate_permission_name(name):
+    """Translates the name of a permission to the user's language.
+
+    :param name: the name of the permission as stored in the database
+
+    :type name: str
+
+    :return:
+      The name (aka short description) of the permission, translated to the
+      current langauge.
+
+    :rtype: str
+    """
+    match = _permission_name_regex.match(name)
+    if match:
+        class_name_pattern = "{class_name}"
+        return _(match.group("prefix") + class_name_pattern).format(class_name=_(match.group("class_name")))
     else:
-        match = _permission_name_regex.match(name)
-        if match:
-            class_name_pattern = "{class_name}"
-            return _(match.group("prefix") + class_name_pattern).format(class_name=_(match.group("class_name")))
-        else:
-            return _(name)
+        return _(name)
+
+
+_existing_permissions = None
+def forget_existing_permissions():
+    """Discards the permissions memoized by `_permission_exists`, so that the
+    next call reads them from the database again.  It is called by signal
+    listeners whenever permissions are created or deleted.
+    """
+    global _existing_permissions
+    _existing_permissions = None
+
+
+def _permission_exists(model, codename):
+    """Returns whether a permission exists for a model.  All existing
+    permissions are read from the database with one query when this function is
+    called for the first time, so that e.g. building the list of addable
+    processes for the menu doesn't need one query per process class.  The
+    memoized permissions are discarded by `forget_existing_permissions`.
+
+    :param model: the model the permission belongs to
+    :param codename: the codename of the permission, without the app label
+
+    :type model: ``class`` (derived from ``django.db.models.Model``)
+    :type codename: str
+
+    :return:
+      whether the permission exists
+
+    :rtype: bool
+    """
+    global _existing_permissions
+    if _existing_permissions is None:
+        _existing_permissions = set(Permission.objects.values_list("content_type__app_label", "content_type__model",
+                                                                   "codename"))
+    content_type = ContentType.objects.get_for_model(model)
+    return (content_type.app_label, content_type.model, codename) in _existing_permissions
 
 
 def get_user_permissions(user):
@@ -102,13 +163,13 @@ def get_user_permissions(user):
     """
     has = []
     has_not = []
-    for permission in Permission.objects.all():
+    for permission in Permission.objects.select_related("content_type"):
         if not issubclass(permission.content_type.model_class(), samples.models.PhysicalProcess):
             full_permission_name = permission.content_type.app_label + "." + permission.codename
             if user.has_perm(full_permission_name):
-                has.append(translate_permission(full_permission_name))
+                has.append(_translate_permission_name(permission.name))
             else:
-                has_not.append(translate_permission(full_permission_name))
+                has_not.append(_translate_permission_name(permission.name))
     return has, has_not
 
 
@@ -126,14 +187,34 @@ def get_user_hash(user):
 
     :type user: django.contrib.auth.models.User
 
+    :return:
+      The user's secret hash
+
+    :rtype: str
+    """
+    return _get_user_hash(settings.SECRET_KEY, user.username)
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_user_hash(secret_key, username):
+    """Calculates the hash for `get_user_hash`.  It is a pure function of its
+    parameters and therefore memoized, because the hash is needed for the menu
+    of every page.
+
+    :param secret_key: the secret key of this Django installation
+    :param username: the login name of the user
+
+    :type secret_key: str
+    :type username: str
+
     :return:
       The user's secret hash
 
     :rtype: str
     """
     user_hash = hashlib.sha1()
-    user_hash.update(settings.SECRET_KEY.encode())
-    user_hash.update(user.username.encode())
+    user_hash.update(secret_key.encode())
+    user_hash.update(username.encode())
     return user_hash.hexdigest()[:10]
 
 
@@ -319,6 +400,48 @@ def get_all_adders(process_class):
             filter(Q(groups__permissions=add_permission) | Q(user_permissions=add_permission)).distinct()
 
 
+def forget_topic_ids(user):
+    """Discards the topic IDs memoized by `get_topic_ids` in the user
+    instance.
+
+    :param user: the user whose topic memberships have changed
+
+    :type user: django.contrib.auth.models.User
+    """
+    try:
+        del user._topic_ids
+    except AttributeError:
+        pass
+
+
+def get_topic_ids(user):
+    """Returns the IDs of all topics the user is a member of.  The result is
+    memoized in the user instance, so that checking the permissions for many
+    samples costs only one query.  Since ``request.user`` lives only as long as
+    the request, so does the memoized result.
+
+    Changes through ``user.topics`` discard the memo by a signal listener.
+    However, changes through ``topic.members`` cannot reach already loaded user
+    instances.  Therefore, views which change them must call
+    `forget_topic_ids` for ``request.user`` before they check permissions
+    again.
+
+    :param user: the user whose topics should be returned
+
+    :type user: django.contrib.auth.models.User
+
+    :return:
+      the IDs of the topics of the user
+
+    :rtype: frozenset of int
+    """
+    try:
+        return user._topic_ids
+    except AttributeError:
+        user._topic_ids = frozenset(user.topics.values_list("id", flat=True))
+        return user._topic_ids
+
+
 class PermissionError(Exception):
     """Common class for all permission exceptions.  We have our own exception class
     and don't use Django's `PermissionDenied` because we need additional
@@ -333,6 +456,7 @@ class PermissionError(Exception):
 
     :type description: str
     """
+    __slots__ = ("user", "description", "new_topic_would_help")
 
     def __init__(self, user, description, new_topic_would_help=False):
         """Class constructor.
@@ -368,6 +492,24 @@ class NoDepartment:
         return False
 
 
+def _can_fully_view_sample(user, sample):
+    """Returns whether the user can view the sample fully.  See
+    `assert_can_fully_view_sample` for the parameters.
+
+    :rtype: bool
+    """
+    if user.is_superuser:
+        return True
+    sample_department = sample.currently_responsible_person.jb_user_details.department or NoDepartment()
+    user_department = user.jb_user_details.department or NoDepartment()
+    if not sample.topic_id:
+        return sample_department == user_department
+    if sample.topic_id in get_topic_ids(user) or sample.currently_responsible_person_id == user.id:
+        return True
+    return sample_department == user_department and not sample.topic.confidential and \
+        user.has_perm("samples.view_every_sample")
+
+
 def assert_can_fully_view_sample(user, sample):
     """Tests whether the user can view the sample fully, i.e. without needing
     a clearance.
@@ -381,28 +523,24 @@ def assert_can_fully_view_sample(user, sample):
     :raises PermissionError: if the user is not allowed to fully view the
         sample.
     """
-    currently_responsible_person = sample.currently_responsible_person
-    sample_department = currently_responsible_person.jb_user_details.department or NoDepartment()
-    user_department = user.jb_user_details.department or NoDepartment()
-    if not sample.topic and sample_department != user_department and not user.is_superuser:
-        description = _("You are not allowed to view the sample since the sample doesn't belong to your department.")
-        raise PermissionError(user, description, new_topic_would_help=True)
-    if sample.topic and user not in sample.topic.members.all() and currently_responsible_person != user and \
-            not user.is_superuser:
-        if sample_department != user_department:
+    if not _can_fully_view_sample(user, sample):
+        currently_responsible_person = sample.currently_responsible_person
+        sample_department = currently_responsible_person.jb_user_details.department or NoDepartment()
+        user_department = user.jb_user_details.department or NoDepartment()
+        if not sample.topic:
+            description = _("You are not allowed to view the sample since the sample doesn't belong to your department.")
+        elif sample_department != user_department:
             description = _("You are not allowed to view the sample since you are not in the sample's topic, nor belongs the "
                             "sample to your department.")
-            raise PermissionError(user, description, new_topic_would_help=True)
         elif sample.topic.confidential:
             description = _("You are not allowed to view the sample since you are not in the sample's topic, nor are you "
                             "its currently responsible person ({name})."). \
                             format(name=utils.get_really_full_name(currently_responsible_person))
-            raise PermissionError(user, description, new_topic_would_help=True)
-        elif not user.has_perm("samples.view_every_sample"):
+        else:
             description = _("You are not allowed to view the sample since you are not in the sample's topic, nor are you "
                             "its currently responsible person ({name}), nor can you view all samples."). \
                             format(name=utils.get_really_full_name(currently_responsible_person))
-            raise PermissionError(user, description, new_topic_would_help=True)
+        raise PermissionError(user, description, new_topic_would_help=True)
 
 
 def assert_can_rename_sample(user, sample):
@@ -493,6 +631,18 @@ def get_sample_clearance(user, sample):
     return clearance
 
 
+def _can_add_physical_process(user, process_class):
+    """Returns whether the user can create a new physical process.  See
+    `assert_can_add_physical_process` for the parameters.
+
+    :rtype: bool
+    """
+    codename = "add_{0}".format(process_class.__name__.lower())
+    if _permission_exists(process_class, codename):
+        return user.has_perm("{app_label}.{codename}".format(app_label=process_class._meta.app_label, codename=codename))
+    return True
+
+
 def assert_can_add_physical_process(user, process_class):
     """Tests whether the user can create a new physical process
     (i.e. deposition, measurement, etching process, clean room work etc).
@@ -506,14 +656,33 @@ def assert_can_add_physical_process(user, process_class):
 
     :raises PermissionError: if the user is not allowed to add a process.
     """
+    if not _can_add_physical_process(user, process_class):
+        permission = "{app_label}.add_{class_name}".format(app_label=process_class._meta.app_label,
+                                                           class_name=process_class.__name__.lower())
+        description = _("You are not allowed to add {process_plural_name} because you don't have the "
+                        "permission “{permission}”.").format(
+            process_plural_name=process_class._meta.verbose_name_plural, permission=translate_permission(permission))
+        raise PermissionError(user, description)
+
+
+def _can_edit_physical_process(user, process):
+    """Returns whether the user can edit a physical process.  See
+    `assert_can_edit_physical_process` for the parameters.
+
+    :rtype: bool
+    """
+    process_class = process.content_type.model_class()
+    codename = "change_{0}".format(process_class.__name__.lower())
+    has_edit_all_permission = \
+        user.has_perm("{app_label}.{codename}".format(app_label=process_class._meta.app_label, codename=codename))
     codename = "add_{0}".format(process_class.__name__.lower())
-    if Permission.objects.filter(codename=codename, content_type=ContentType.objects.get_for_model(process_class)).exists():
-        permission = "{app_label}.{codename}".format(app_label=process_class._meta.app_label, codename=codename)
-        if not user.has_perm(permission):
-            description = _("You are not allowed to add {process_plural_name} because you don't have the "
-                            "permission “{permission}”.").format(
-                process_plural_name=process_class._meta.verbose_name_plural, permission=translate_permission(permission))
-            raise PermissionError(user, description)
+    if _permission_exists(process_class, codename):
+        has_add_permission = \
+            user.has_perm("{app_label}.{codename}".format(app_label=process_class._meta.app_label, codename=codename))
+    else:
+        has_add_permission = True
+    return (has_add_permission and process.operator_id == user.id) or (has_add_permission and not process.finished) or \
+        has_edit_all_permission or user.is_superuser
 
 
 def assert_can_edit_physical_process(user, process):
@@ -532,18 +701,7 @@ def assert_can_edit_physical_process(user, process):
     :raises PermissionError: if the user is not allowed to edit the
         process.
     """
-    process_class = process.content_type.model_class()
-    codename = "change_{0}".format(process_class.__name__.lower())
-    has_edit_all_permission = \
-        user.has_perm("{app_label}.{codename}".format(app_label=process_class._meta.app_label, codename=codename))
-    codename = "add_{0}".format(process_class.__name__.lower())
-    if Permission.objects.filter(codename=codename, content_type=ContentType.objects.get_for_model(process_class)).exists():
-        has_add_permission = \
-            user.has_perm("{app_label}.{codename}".format(app_label=process_class._meta.app_label, codename=codename))
-    else:
-        has_add_permission = True
-    if (not has_add_permission or process.operator != user) and not (has_add_permission and not process.finished) and \
-            not has_edit_all_permission and not user.is_superuser:
+    if not _can_edit_physical_process(user, process):
         description = _("You are not allowed to edit the process “{process}” because you are not the operator "
                         "of this process.").format(process=process)
         raise PermissionError(user, description)
@@ -618,7 +776,7 @@ def assert_can_view_lab_notebook(user, process_class):
     """
     codename = "view_every_{0}".format(process_class.__name__.lower())
     permission_name_to_view_all = "{app_label}.{codename}".format(app_label=process_class._meta.app_label, codename=codename)
-    if Permission.objects.filter(codename=codename, content_type=ContentType.objects.get_for_model(process_class)).exists():
+    if _permission_exists(process_class, codename):
         has_view_all_permission = user.has_perm(permission_name_to_view_all)
     else:
         has_view_all_permission = user.is_superuser
@@ -630,6 +788,49 @@ def assert_can_view_lab_notebook(user, process_class):
         raise PermissionError(user, description)
 
 
+def _can_fully_view_any_sample(user, samples_query):
+    """Returns whether the user can fully view at least one of the given
+    samples.  The common cases – the user is a member of the topic of one of
+    the samples, or is responsible for one of them – are decided by a single
+    query.  Only otherwise, the samples are checked one by one, with all data
+    needed for this fetched in the same query.
+
+    :param user: the user whose permission should be checked
+    :param samples_query: the samples to be checked
+
+    :type user: django.contrib.auth.models.User
+    :type samples_query: ``QuerySet`` of `samples.models.Sample`
+
+    :return:
+      whether the user can fully view at least one of the samples
+
+    :rtype: bool
+    """
+    if samples_query.filter(Q(topic__in=get_topic_ids(user)) |
+                            Q(currently_responsible_person=user, topic__isnull=False)).exists():
+        return True
+    return any(has_permission_to_fully_view_sample(user, sample) for sample in samples_query.select_related(
+        "topic", "currently_responsible_person__jb_user_details__department"))
+
+
+def _can_view_physical_process(user, process):
+    """Returns whether the user can view a physical process.  See
+    `assert_can_view_physical_process` for the parameters.
+
+    :rtype: bool
+    """
+    process_class = process.content_type.model_class()
+    codename = "view_every_{0}".format(process_class.__name__.lower())
+    permission_name_to_view_all = "{app_label}.{codename}".format(app_label=process_class._meta.app_label, codename=codename)
+    if _permission_exists(process_class, codename):
+        has_view_all_permission = user.has_perm(permission_name_to_view_all)
+    else:
+        has_view_all_permission = user.is_superuser
+    return has_view_all_permission or process.operator_id == user.id or \
+        _can_fully_view_any_sample(user, process.samples.all()) or \
+        samples.models.Clearance.objects.filter(user=user, processes=process).exists()
+
+
 def assert_can_view_physical_process(user, process):
     """Tests whether the user can view a physical process (i.e. deposition,
     measurement, etching process, clean room work etc).  You can view a process
@@ -648,16 +849,10 @@ def assert_can_view_physical_process(user, process):
     :raises PermissionError: if the user is not allowed to view the
         process.
     """
-    process_class = process.content_type.model_class()
-    codename = "view_every_{0}".format(process_class.__name__.lower())
-    permission_name_to_view_all = "{app_label}.{codename}".format(app_label=process_class._meta.app_label, codename=codename)
-    if Permission.objects.filter(codename=codename, content_type=ContentType.objects.get_for_model(process_class)).exists():
-        has_view_all_permission = user.has_perm(permission_name_to_view_all)
-    else:
-        has_view_all_permission = user.is_superuser
-    if not has_view_all_permission and process.operator != user and \
-            not any(has_permission_to_fully_view_sample(user, sample) for sample in process.samples.all()) and \
-            not samples.models.Clearance.objects.filter(user=user, processes=process).exists():
+    if not _can_view_physical_process(user, process):
+        process_class = process.content_type.model_class()
+        permission_name_to_view_all = "{app_label}.view_every_{class_name}".format(
+            app_label=process_class._meta.app_label, class_name=process_class.__name__.lower())
         description = _("You are not allowed to view the process “{process}” because neither you have the "
                         "permission “{permission}”, nor you are allowed to view one of the processed samples, "
                         "nor are you the operator, nor is there a clearance for you for this process.").format(
@@ -720,8 +915,8 @@ def assert_can_add_result_process(user, sample_or_series):
     :raises PermissionError: if the user is not allowed to add the result
         process to the sample or series
     """
-    if sample_or_series.currently_responsible_person != user and sample_or_series.topic and \
-             user not in sample_or_series.topic.members.all() and not user.is_superuser:
+    if sample_or_series.currently_responsible_person_id != user.id and sample_or_series.topic_id and \
+             sample_or_series.topic_id not in get_topic_ids(user) and not user.is_superuser:
         if isinstance(sample_or_series, samples.models.Sample):
             description = _("You are not allowed to add the result to {sample_or_series} because neither are you the "
                             "currently responsible person for this sample, nor are you a member of its topic.").format(
@@ -733,6 +928,22 @@ def assert_can_add_result_process(user, sample_or_series):
         raise PermissionError(user, description)
 
 
+def _can_edit_sample(user, sample):
+    """Returns whether the user can edit, split, and kill a sample.  See
+    `assert_can_edit_sample` for the parameters.
+
+    :rtype: bool
+    """
+    if user.is_superuser:
+        return True
+    if not sample.topic_id:
+        sample_department = sample.currently_responsible_person.jb_user_details.department or NoDepartment()
+        user_department = user.jb_user_details.department or NoDepartment()
+        return sample_department == user_department
+    return sample.currently_responsible_person_id == user.id or \
+        sample.topic_id in get_topic_ids(user) and get_topic_manager_permission() in user.user_permissions.all()
+
+
 def assert_can_edit_sample(user, sample):
     """Tests whether the user can edit, split, and kill a sample.
 
@@ -744,15 +955,10 @@ def assert_can_edit_sample(user, sample):
 
     :raises PermissionError: if the user is not allowed to edit the sample
     """
-    currently_responsible_person = sample.currently_responsible_person
-    sample_department = currently_responsible_person.jb_user_details.department or NoDepartment()
-    user_department = user.jb_user_details.department or NoDepartment()
-    if not sample.topic and sample_department != user_department and not user.is_superuser:
-        description = _("You are not allowed to edit the sample since the sample doesn't belong to your department.")
-        raise PermissionError(user, description, new_topic_would_help=True)
-    topic_manager_permission = get_topic_manager_permission()
-    if sample.topic and currently_responsible_person != user and not user.is_superuser and not \
-        (user in sample.topic.members.all() and topic_manager_permission in user.user_permissions.all()):
+    if not _can_edit_sample(user, sample):
+        if not sample.topic:
+            description = _("You are not allowed to edit the sample since the sample doesn't belong to your department.")
+            raise PermissionError(user, description, new_topic_would_help=True)
         description = _("You are not allowed to edit the sample “{name}” (including splitting, declaring dead, and deleting) "
                         "because you are not the currently responsible person for this sample.").format(name=sample)
         raise PermissionError(user, description)
@@ -771,7 +977,7 @@ def assert_can_edit_sample_series(user, sample_series):
     :raises PermissionError: if the user is not allowed to edit the sample
         series
     """
-    if sample_series.currently_responsible_person != user and not user.is_superuser:
+    if sample_series.currently_responsible_person_id != user.id and not user.is_superuser:
         description = _("You are not allowed to edit the sample series “{name}” because "
                         "you are not the currently responsible person for this sample series.").format(name=sample_series)
         raise PermissionError(user, description)
@@ -789,7 +995,7 @@ def assert_can_view_sample_series(user, sample_series):
     :raises PermissionError: if the user is not allowed to view the sample
         series
     """
-    if sample_series.currently_responsible_person != user and  user not in sample_series.topic.members.all()and \
+    if sample_series.currently_responsible_person_id != user.id and sample_series.topic_id not in get_topic_ids(user) and \
             not user.is_superuser:
         description = _("You are not allowed to view the sample series “{name}” because neither are "
                         "you the currently responsible person for it, nor are you in its topic.").format(name=sample_series)
@@ -875,9 +1081,9 @@ def assert_can_edit_topic(user, topic=None):
                 .format(name=translate_permission("jb_common.add_topic"))
             raise PermissionError(user, description)
     else:
-        if user in topic.members.all():
+        if topic.id in get_topic_ids(user):
             if not user.has_perm("jb_common.change_topic") and \
-                    topic.manager != user:
+                    topic.manager_id != user.id:
                 description = _("You are not allowed to change this topic because you don't have the permission "
                                 "“{0}” or “{1}”.").format(translate_permission("jb_common.change_topic"),
                                                            translate_permission("jb_common.edit_their_topics"))
@@ -944,10 +1150,11 @@ def assert_can_view_feed(hash_value, user):
             raise PermissionError(None, description)
 
 
-# Now, I inject the ``has_permission_to_...`` functions into this module for
-# for every ``assert_can_...`` function found here.
+# Now, the ``has_permission_to_...`` functions for every ``assert_can_...``
+# function.  If there is a boolean predicate, it is used directly so that no
+# exception is raised and no error message is built.
 
-def generate_permission_function(assert_func):
+def _generate_permission_function(assert_func):
     def has_permission(*args, **kwargs):
         try:
             assert_func(*args, **kwargs)
@@ -958,13 +1165,27 @@ def generate_permission_function(assert_func):
     return has_permission
 
 
-import copy, inspect
-_globals = copy.copy(globals())
-all_assertion_functions = [func for func in _globals.values()
-                           if inspect.isfunction(func) and func.__name__.startswith("assert_can_")]
-for func in all_assertion_functions:
-    new_name = "has_permission_to_" + func.__name__[len("assert_can_"):]
-    globals()[new_name] = generate_permission_function(func)
+has_permission_to_fully_view_sample = _can_fully_view_sample
+has_permission_to_rename_sample = _generate_permission_function(assert_can_rename_sample)
+has_permission_to_delete_sample = _generate_permission_function(assert_can_delete_sample)
+has_permission_to_add_physical_process = _can_add_physical_process
+has_permission_to_edit_physical_process = _can_edit_physical_process
+has_permission_to_delete_physical_process = _generate_permission_function(assert_can_delete_physical_process)
+has_permission_to_add_edit_physical_process = _generate_permission_function(assert_can_add_edit_physical_process)
+has_permission_to_view_lab_notebook = _generate_permission_function(assert_can_view_lab_notebook)
+has_permission_to_view_physical_process = _can_view_physical_process
+has_permission_to_edit_result_process = _generate_permission_function(assert_can_edit_result_process)
+has_permission_to_view_result_process = _generate_permission_function(assert_can_view_result_process)
+has_permission_to_add_result_process = _generate_permission_function(assert_can_add_result_process)
+has_permission_to_edit_sample = _can_edit_sample
+has_permission_to_edit_sample_series = _generate_permission_function(assert_can_edit_sample_series)
+has_permission_to_view_sample_series = _generate_permission_function(assert_can_view_sample_series)
+has_permission_to_add_external_operator = _generate_permission_function(assert_can_add_external_operator)
+has_permission_to_edit_external_operator = _generate_permission_function(assert_can_edit_external_operator)
+has_permission_to_view_external_operator = _generate_permission_function(assert_can_view_external_operator)
+has_permission_to_edit_topic = _generate_permission_function(assert_can_edit_topic)
+has_permission_to_edit_users_topics = _generate_permission_function(assert_can_edit_users_topics)
+has_permission_to_view_feed = _generate_permission_function(assert_can_view_feed)
 
 
 _ = gettext
@@ -165,12 +165,14 @@ import datetime, hashlib
 from django.db.models import signals
 import django.utils.timezone
 from django.dispatch import receiver
-from django.contrib.auth.models import User
+from django.contrib.auth.models import User, Permission
 import django.contrib.contenttypes.management
 from django.contrib.contenttypes.models import ContentType
 from jb_common import models as jb_common_app
 import jb_common.signals
 from samples import models as samples_app
+import samples.permissions
+import samples.utils.views
 
 
 @receiver(signals.m2m_changed, sender=samples_app.Sample.watchers.through)
@@ -190,6 +192,7 @@ def touch_my_samples(sender, instance, action, reverse, model, pk_set, **kwargs)
     if reverse:
         # `instance` is django.contrib.auth.models.User
         if action in ["post_add", "post_remove", "post_clear"]:
+            samples.utils.views.forget_my_samples(instance)
             user_details = instance.samples_user_details
             user_details.my_samples_timestamp = user_details.my_samples_list_timestamp = now
             user_details.save()
@@ -269,6 +272,18 @@ def add_all_user_details(sender, **kwargs):
         add_user_details(User, user, created=True)
 
 
+@receiver(signals.post_migrate)
+@receiver(signals.post_save, sender=Permission)
+@receiver(signals.post_delete, sender=Permission)
+def expire_existing_permissions(sender, **kwargs):
+    """Discards the set of existing permissions memoized in
+    :py:mod:`samples.permissions`.  Otherwise, permissions created after the
+    first permission check, e.g. for new process classes by a migration, would
+    be treated as missing until the process is restarted.
+    """
+    samples.permissions.forget_existing_permissions()
+
+
 @receiver(signals.post_save, sender=User)
 def touch_user_samples_and_processes(sender, instance, created, **kwargs):
     """Removes all cached items of samples, sample series, and processes which
@@ -400,6 +415,17 @@ def touch_my_samples_list_by_topic_memberships(sender, instance, action, reverse
                 samples_app.UserDetails.objects.filter(user__pk__in=pk_set).update(my_samples_list_timestamp=now)
 
 
+@receiver(signals.m2m_changed, sender=jb_common_app.Topic.members.through)
+def expire_topic_ids(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Discards the topic IDs memoized in the user instance by
+    :py:func:`samples.permissions.get_topic_ids` if the user's topics were
+    changed through ``user.topics``.
+    """
+    if reverse and action in ["post_add", "post_remove", "post_clear"]:
+        # `instance` is a user
+        samples.permissions.forget_topic_ids(instance)
+
+
 @receiver(signals.m2m_changed, sender=jb_common_app.Topic.members.through)
 def touch_display_settings_by_topic(sender, instance, action, reverse, model, pk_set, **kwargs):
     """Touch the display settings of all users for which the topics have
@@ -24,7 +24,7 @@ from io import StringIO
 from django.conf import settings
 from django.core.cache import cache
 from django.db.models import Q
-from django.http import Http404, HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.utils.translation import gettext_lazy as _, gettext
 from django.contrib.contenttypes.models import ContentType
 import django.utils.text
@@ -32,7 +32,7 @@ from jb_common import mimeparse
 from samples import models, permissions
 from samples.utils import sample_names
 from samples.views.table_export import build_column_group_list, ColumnGroupsForm, \
-    ColumnsForm, generate_table_rows, flatten_tree, OldDataForm, SwitchRowForm
+    ColumnsForm, generate_table_rows, iter_table_rows, iter_flattened_tree, OldDataForm, SwitchRowForm
 import jb_common.utils.base
 
 
@@ -183,9 +183,7 @@ def remove_samples_from_my_samples(samples, user):
     :type samples: list of `samples.models.Sample`
     :type user: django.contrib.auth.models.User
     """
-    # FixMe: How does it react if a sample hasn't been in ``my_samples``?
-    for sample in samples:
-        sample.watchers.remove(user)
+    user.my_samples.remove(*samples)
 
 
 class StructuredSeries:
@@ -498,6 +496,17 @@ def enforce_clearance(user, clearance_processes, destination_user, sample, clear
                           split_origin.timestamp)
 
 
+class _Echo:
+    """Pseudo file object which only implements ``write``, returning the
+    written value instead of storing it.  Together with a `csv.writer`, it
+    turns table rows into strings which can be fed into a
+    ``StreamingHttpResponse``.
+    """
+
+    def write(self, value):
+        return value
+
+
 def table_export(request, data, label_column_heading):
     """Helper function which does almost all work needed for a CSV table
     export view.  This is not a view per se, however, it is called by views,
@@ -550,28 +559,38 @@ def table_export(request, data, label_column_heading):
         if columns_form.is_valid():
             selected_columns = columns_form.cleaned_data["columns"]
             label_column = [row.descriptive_name for row in data.children]
-            table = generate_table_rows(flatten_tree(data), columns, columns_form.cleaned_data["columns"],
-                                        label_column, label_column_heading)
-            start_column_index = 1 if any(label_column) else 0
+            include_label_column = any(label_column)
             if not(previous_columns) and selected_columns:
+                table = generate_table_rows(iter_flattened_tree(data), columns, selected_columns, label_column,
+                                            label_column_heading, include_label_column)
+                start_column_index = 1 if include_label_column else 0
                 switch_row_forms = [SwitchRowForm(prefix=str(i), initial={"active": any(row[start_column_index:])})
                                     for i, row in enumerate(table)]
             else:
-                switch_row_forms = [SwitchRowForm(get_data, prefix=str(i)) for i in range(len(table))]
+                # One more than the number of rows because of the head row
+                switch_row_forms = [SwitchRowForm(get_data, prefix=str(i)) for i in range(len(data.children) + 1)]
             all_switch_row_forms_valid = all([switch_row_form.is_valid() for switch_row_form in switch_row_forms])
             if all_switch_row_forms_valid and \
                     previous_column_groups == selected_column_groups and previous_columns == selected_columns:
-                reduced_table = [row for i, row in enumerate(table) if switch_row_forms[i].cleaned_data["active"] or i == 0]
+                # The rows are generated while they are sent, so that the table
+                # never exists as a whole in memory.
+                rows = iter_table_rows(iter_flattened_tree(data), columns, selected_columns, label_column,
+                                       label_column_heading, include_label_column)
+                reduced_table = (row for i, row in enumerate(rows) if switch_row_forms[i].cleaned_data["active"] or i == 0)
                 if requested_mime_type == "application/json":
-                    data = [{reduced_table[0][i]: cell for i, cell in enumerate(row) if cell} for row in reduced_table[1:]]
+                    head_row = next(reduced_table)
+                    data = [{head_row[i]: cell for i, cell in enumerate(row) if cell} for row in reduced_table]
                     return jb_common.utils.base.respond_in_json(data)
                 else:
-                    response = HttpResponse(content_type="text/csv; charset=utf-8")
+                    writer = csv.writer(_Echo(), dialect=csv.excel_tab)
+                    response = StreamingHttpResponse((writer.writerow(row) for row in reduced_table),
+                                                     content_type="text/csv; charset=utf-8")
                     response['Content-Disposition'] = \
                         "attachment; filename=juliabase--{0}.txt".format(django.utils.text.slugify(data.descriptive_name))
-                    writer = csv.writer(response, dialect=csv.excel_tab)
-                    writer.writerows(reduced_table)
                 return response
+            if table is None:
+                table = generate_table_rows(iter_flattened_tree(data), columns, selected_columns, label_column,
+                                            label_column_heading, include_label_column)
     if selected_column_groups != previous_column_groups:
         columns_form = ColumnsForm(column_groups, columns, selected_column_groups, initial={"columns": selected_columns})
     old_data_form = OldDataForm(initial={"column_groups": selected_column_groups, "columns": selected_columns})
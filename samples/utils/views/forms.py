@@ -42,7 +42,8 @@ __all__ = ("OperatorField", "ProcessForm", "DepositionForm", "get_my_steps", "In
            "EditDescriptionForm", "SampleField", "MultipleSamplesField", "FixedOperatorField", "DepositionSamplesForm",
            "time_pattern", "clean_time_field", "clean_timestamp_field",
            "clean_quantity_field", "collect_subform_indices", "normalize_prefixes", "dead_samples",
-           "choices_of_content_types", "check_sample_name", "SampleSelectForm", "MultipleSamplesSelectForm")
+           "choices_of_content_types", "check_sample_name", "SampleSelectForm", "MultipleSamplesSelectForm",
+           "forget_my_samples")
 
 
 class OperatorField(forms.ChoiceField):
@@ -247,7 +248,7 @@ class ProcessForm(ModelForm):
         referentially_valid = True
         if self.is_valid() and samples_form.is_valid():
             if isinstance(samples_form, SampleSelectForm):
-                samples = [samples_form.cleaned_data["sample"]]
+                samples = (samples_form.cleaned_data["sample"],)
             else:
                 samples = samples_form.cleaned_data["sample_list"]
             dead_samples_list = dead_samples(samples, self.cleaned_data["timestamp"])
@@ -274,7 +275,7 @@ class DepositionForm(ProcessForm):
         if self.process and self.process.finished:
             if self.process.number != number:
                 raise ValidationError(_("The deposition number must not be changed."), code="invalid")
-        else:
+        elif not self.process or self.process.number != number:
             if models.Deposition.objects.filter(number=number).exists():
                 raise ValidationError(_("This deposition number exists already."), code="duplicate")
         return number
@@ -418,7 +419,7 @@ class GeneralSampleField:
             process that is about to be edited.
 
         :type user: django.contrib.auth.models.User
-        :type samples: iterable of `samples.models.Sample`
+        :type samples: list or tuple of `samples.models.Sample`
         :type important_samples: iterable of `samples.models.Sample`
         """
         def get_samples_from_topic(topic, folded_topics_and_sample_series):
@@ -738,7 +739,7 @@ def dead_samples(samples, timestamp):
     :param samples: the samples to be tested
     :param timestamp: the timestamp for which the dead samples should be found
 
-    :type samples: list of `samples.models.Sample`
+    :type samples: list or tuple of `samples.models.Sample`
     :type timestamp: datetime.datetime
 
     :return:
@@ -746,14 +747,10 @@ def dead_samples(samples, timestamp):
 
     :rtype: set of `samples.models.Sample`
     """
-    result = set()
-    for sample in samples:
-        death_timestamps = \
-            sample.processes.filter(sampledeath__timestamp__isnull=False).values_list("timestamp", flat=True)
-        assert len(death_timestamps) <= 1
-        if death_timestamps and death_timestamps[0] <= timestamp:
-            result.add(sample)
-    return result
+    dead_sample_ids = set(models.Sample.objects.filter(
+        pk__in=[sample.pk for sample in samples], processes__sampledeath__isnull=False,
+        processes__timestamp__lte=timestamp).values_list("pk", flat=True))
+    return {sample for sample in samples if sample.pk in dead_sample_ids}
 
 
 def choices_of_content_types(classes):
@@ -824,6 +821,44 @@ def check_sample_name(match, user):
             raise ValidationError(_("The initials do not match yours, nor any of your external contacts."), code="invalid")
 
 
+def forget_my_samples(user):
+    """Discards the “My Samples” memoized by `_get_my_samples` in the user
+    instance.  It is called by a signal listener whenever ``user.my_samples``
+    is changed.
+
+    :param user: the user whose “My Samples” have changed
+
+    :type user: django.contrib.auth.models.User
+    """
+    try:
+        del user._my_samples
+    except AttributeError:
+        pass
+
+
+def _get_my_samples(user):
+    """Returns the “My Samples” of the user.  The result is memoized in the user
+    instance, so that all sample selection forms of a request share one query.
+    Changes through ``user.my_samples`` discard the memo (see
+    `forget_my_samples`).  Changes through ``sample.watchers`` cannot reach
+    already loaded user instances, so use the former for the current user.
+
+    :param user: the user whose “My Samples” should be returned
+
+    :type user: django.contrib.auth.models.User
+
+    :return:
+      the “My Samples” of the user
+
+    :rtype: tuple of `samples.models.Sample`
+    """
+    try:
+        return user._my_samples
+    except AttributeError:
+        user._my_samples = tuple(user.my_samples.all())
+        return user._my_samples
+
+
 class SampleSelectForm(forms.Form):
     """Form for the sample selection field.  You can only select *one* sample
     per process (in contrast to depositions).
@@ -844,7 +879,7 @@ class SampleSelectForm(forms.Form):
         :type preset_sample: `samples.models.Sample`
         """
         super().__init__(*args, **kwargs)
-        samples = user.my_samples.all()
+        samples = _get_my_samples(user)
         important_samples = set()
         if process_instance:
             sample = process_instance.samples.get()
@@ -869,11 +904,12 @@ class MultipleSamplesSelectForm(GenericMultipleSamplesSelectForm):
     """
     def __init__(self, user, process_instance, preset_sample, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        samples = user.my_samples.all()
+        samples = _get_my_samples(user)
         important_samples = set()
         if process_instance:
-            important_samples.update(process_instance.samples.all())
-            self.fields["sample_list"].initial = list(process_instance.samples.values_list("pk", flat=True))
+            process_samples = list(process_instance.samples.all())
+            important_samples.update(process_samples)
+            self.fields["sample_list"].initial = [sample.pk for sample in process_samples]
         else:
             self.fields["sample_list"].initial = []
         if preset_sample:
@@ -889,10 +925,11 @@ class DepositionSamplesForm(GenericMultipleSamplesSelectForm):
     when editing an *existing* process.
     """
     def __init__(self, user, deposition, preset_sample, data=None, **kwargs):
-        samples = user.my_samples.all()
+        samples = _get_my_samples(user)
         important_samples = set()
         if deposition:
-            kwargs["initial"] = {"sample_list": list(deposition.samples.values_list("pk", flat=True))}
+            deposition_samples = list(deposition.samples.all())
+            kwargs["initial"] = {"sample_list": [sample.pk for sample in deposition_samples]}
             if deposition.finished:
                 # If editing a finished, existing deposition, always have an
                 # *unbound* form so that the samples are set although sample
@@ -905,7 +942,7 @@ class DepositionSamplesForm(GenericMultipleSamplesSelectForm):
                 self.dont_check_validity = True
             else:
                 super().__init__(data, **kwargs)
-            important_samples.update(deposition.samples.all())
+            important_samples.update(deposition_samples)
         else:
             super().__init__(data, **kwargs)
             self.fields["sample_list"].initial = []
@@ -100,7 +100,7 @@ def add_sample(request):
         if request.user.is_superuser:
             error_message += " {}".format(error)
         raise JSONRequestException(5, error_message)
-    sample.watchers.add(request.user)
+    request.user.my_samples.add(sample)
     return respond_in_json(sample.pk)
 
 
@@ -27,7 +27,8 @@ information.
 
 import datetime, re
 from urllib.parse import quote_plus
-from django.http import Http404, HttpResponse
+from django.http import Http404
+from django.http.response import HttpResponseBase
 from django.shortcuts import render
 import django.urls
 from django.template import loader, RequestContext
@@ -210,7 +211,7 @@ def export(request, process_name, year_and_month):
     result = utils.table_export(request, data, _("process"))
     if isinstance(result, tuple):
         column_groups_form, columns_form, table, switch_row_forms, old_data_form = result
-    elif isinstance(result, HttpResponse):
+    elif isinstance(result, HttpResponseBase):
         return result
     title = _("Table export for “{name}”").format(name=data.descriptive_name)
     return render(request, "samples/table_export.html", {"title": title, "column_groups": column_groups_form,
@@ -22,6 +22,7 @@ better place to be (yet).
 from django.shortcuts import render, get_object_or_404
 from samples import models, permissions
 from django.http import HttpResponsePermanentRedirect, Http404
+from django.http.response import HttpResponseBase
 from django.views.decorators.http import require_http_methods
 import django.urls
 import django.forms as forms
@@ -221,9 +222,16 @@ def show_process(request, process_id, process_name="Process"):
     except AttributeError:
         identifying_field = "id"
     try:
-        process = get_object_or_404(process_class, **{identifying_field: process_id}).actual_instance
+        process = get_object_or_404(process_class.objects.select_related("content_type", "operator", "external_operator"),
+                                    **{identifying_field: process_id})
     except ValueError:
         raise Http404("Invalid value for {} passed: {}".format(identifying_field, repr(process_id)))
+    if process.content_type.model_class() is process_class:
+        # Mostly, the process is its own actual instance.  Then, later calls of
+        # ``actual_instance`` don't need to fetch it again.
+        process._meta.get_field("actual_instance").set_cached_value(process, process)
+    else:
+        process = process.actual_instance
     if not isinstance(process, models.PhysicalProcess):
         raise Http404("No physical process with that ID was found.")
     permissions.assert_can_view_physical_process(request.user, process)
@@ -324,7 +332,7 @@ def export_process(request, process_id):
     result = utils.table_export(request, data, _("sample"))
     if isinstance(result, tuple):
         column_groups_form, columns_form, table, switch_row_forms, old_data_form = result
-    elif isinstance(result, HttpResponse):
+    elif isinstance(result, HttpResponseBase):
         return result
     title = _("Table export for “{name}”").format(name=data.descriptive_name)
     return render(request, "samples/table_export.html", {"title": title, "column_groups": column_groups_form,
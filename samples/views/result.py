@@ -29,7 +29,7 @@ from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 import django.utils.timezone
-from django.http import HttpResponse
+from django.http.response import HttpResponseBase
 from django.shortcuts import render, get_object_or_404
 from django.utils.translation import gettext_lazy as _, gettext, pgettext_lazy
 from django.utils.text import capfirst
@@ -648,7 +648,7 @@ def export(request, process_id):
     result = utils.table_export(request, data, _("row"))
     if isinstance(result, tuple):
         column_groups_form, columns_form, table, switch_row_forms, old_data_form = result
-    elif isinstance(result, HttpResponse):
+    elif isinstance(result, HttpResponseBase):
         return result
     title = _("Table export for “{name}”").format(name=data.descriptive_name)
     return render(request, "samples/table_export.html", {"title": title, "column_groups": column_groups_form,
@@ -33,7 +33,8 @@ import django.urls
 import django.forms as forms
 from django.core.cache import cache
 from django.db.models import Q
-from django.http import Http404, HttpResponse
+from django.http import Http404
+from django.http.response import HttpResponseBase
 from django.shortcuts import render, get_object_or_404
 from django.utils.translation import gettext_lazy as _, gettext, ngettext
 from django.views.decorators.http import condition
@@ -940,11 +941,11 @@ def advanced_search(request):
     root_form = jb_common.search.SearchModelForm(model_list, request.GET)
     search_performed = False
     no_permission_message = None
-    _search_parameters_hash = hashlib.sha1(json.dumps(sorted(
-        {key: value for key, value in request.GET.items() if not "__" in key and key != "_search_parameters_hash"}
-        .items())).encode()).hexdigest()
     column_groups_form = columns_form = table = switch_row_forms = old_data_form = None
     if root_form.is_valid() and root_form.cleaned_data["_model"]:
+        _search_parameters_hash = hashlib.sha1(json.dumps(sorted(
+            {key: value for key, value in request.GET.items() if not "__" in key and key != "_search_parameters_hash"}
+            .items())).encode()).hexdigest()
         search_tree = get_all_models()[root_form.cleaned_data["_model"]].get_search_tree_node()
         parse_tree = root_form.cleaned_data["_model"] == root_form.cleaned_data["_old_model"]
         search_tree.parse_data(request.GET if parse_tree else None, "")
@@ -993,7 +994,7 @@ def advanced_search(request):
                     export_result = utils.table_export(request, data_node, "")
                     if isinstance(export_result, tuple):
                         column_groups_form, columns_form, table, switch_row_forms, old_data_form = export_result
-                    elif isinstance(export_result, HttpResponse):
+                    elif isinstance(export_result, HttpResponseBase):
                         return export_result
             search_performed = True
         root_form = jb_common.search.SearchModelForm(
@@ -1033,7 +1034,7 @@ def export(request, sample_name):
     result = utils.table_export(request, data, _("process"))
     if isinstance(result, tuple):
         column_groups_form, columns_form, table, switch_row_forms, old_data_form = result
-    elif isinstance(result, HttpResponse):
+    elif isinstance(result, HttpResponseBase):
         return result
     title = _("Table export for “{name}”").format(name=data.descriptive_name)
     return render(request, "samples/table_export.html", {"title": title, "column_groups": column_groups_form,
@@ -27,7 +27,7 @@ import hashlib, datetime
 from django import forms
 from django.contrib.auth.decorators import login_required
 from django.forms.utils import ValidationError
-from django.http import HttpResponse
+from django.http.response import HttpResponseBase
 import django.utils.timezone
 from django.shortcuts import render, get_object_or_404
 from django.utils.translation import gettext_lazy as _, gettext, ngettext
@@ -420,7 +420,7 @@ def export(request, name):
     result = utils.table_export(request, data, _("sample"))
     if isinstance(result, tuple):
         column_groups_form, columns_form, table, switch_row_forms, old_data_form = result
-    elif isinstance(result, HttpResponse):
+    elif isinstance(result, HttpResponseBase):
         return result
     title = _("Table export for “{name}”").format(name=data.descriptive_name)
     return render(request, "samples/table_export.html", {"title": title, "column_groups": column_groups_form,
@@ -141,8 +141,7 @@ class GlobalNewDataForm(Form):
         """
         deposition_instance = kwargs.pop("deposition_instance")
         super().__init__(data, **kwargs)
-        self.fields["new_location"].initial = \
-            models.default_location_of_deposited_samples.get(deposition_instance.__class__, "")
+        self.fields["new_location"].initial = deposition_instance.default_location_of_deposited_samples
         self.fields["new_location"].widget = forms.TextInput(attrs={"size": "40"})
 
 
@@ -448,14 +447,14 @@ def forms_from_database(user, deposition, remote_client, new_names):
                 return deposition.number + name_postfix
             else:
                 return sample.name
-    samples = deposition.samples.all()
-    original_data_forms = [OriginalDataForm(remote_client, new_name(sample),
-                                            initial={"sample": sample.name, "new_name": new_name(sample)},
+    samples_and_new_names = [(sample, new_name(sample)) for sample in deposition.samples.all()]
+    original_data_forms = [OriginalDataForm(remote_client, sample_new_name,
+                                            initial={"sample": sample.name, "new_name": sample_new_name},
                                             prefix=str(i))
-                           for i, sample in enumerate(samples)]
-    new_name_form_lists = [[NewNameForm(user, readonly=True, initial={"new_name": new_name(sample)}, prefix="{0}_0".
+                           for i, (sample, sample_new_name) in enumerate(samples_and_new_names)]
+    new_name_form_lists = [[NewNameForm(user, readonly=True, initial={"new_name": sample_new_name}, prefix="{0}_0".
                                         format(i))]
-                           for i, sample in enumerate(samples)]
+                           for i, (sample, sample_new_name) in enumerate(samples_and_new_names)]
     global_new_data_form = GlobalNewDataForm(deposition_instance=deposition)
     return original_data_forms, new_name_form_lists, global_new_data_form
 
@@ -59,8 +59,8 @@ The second data structure for columns is simply called ``columns``, and it is
 built parallely to ``column_groups`` in `build_column_group_list`.  Whenever a
 new column groups is added, its keys (from the key–value items or its node) are
 appended to the list of columns.  The resulting indices in ``columns`` are
-saved in the column group attribute `ColumnGroup.key_indices`.  This is a
-dictionary, mapping key names to their index in the ``columns`` list.
+saved in the column group attribute `ColumnGroup.column_indices`.  This is a
+sorted list of indices in the ``columns`` list.
 
 The web view
 ............
@@ -75,14 +75,16 @@ Generating the final table
 ..........................
 
 The last needed data structure is a list of all rows, generated by
-`flatten_tree`.  Every row is represented by a dictionary with str keys being
-names of column groups.  They are mapped to another dictionary mapping key
-names to values.  This list of rows is generated by `flatten_tree`.
+`flatten_tree`, or row by row by `iter_flattened_tree`.  Every row is
+represented by a flat dictionary which maps tuples of the form (column group
+name, key name) to values.
 
-Finally we're ready to generate the table with `generate_table_rows`: For each
-row, the list of indices is used to find the value for the respective column by
-using the ``columns`` list, which contains a `Column` instance, which is able
-to retrieve the final table cell value through the `Column.get_value` method.
+Finally we're ready to generate the table with `generate_table_rows`, or row
+by row with `iter_table_rows`: For each row, the list of indices is used to
+find the value for the respective column by using the ``columns`` list, which
+contains a `Column` instance, which is able to retrieve the final table cell
+value through the `Column.get_value` method.  (For speed, `iter_table_rows`
+uses equivalent getter functions made once per column by `_make_getter`.)
 
 This way, the table is represented by a list of rows, and each row a list of
 cells.  Every cell item is a Python object.  The zeroth row contains the
@@ -106,6 +108,7 @@ database model classes will show you how to use it (they are all very
 strightforward).
 """
 
+import collections, sys
 from django.forms.utils import ValidationError
 from django.utils.translation import gettext_lazy as _, gettext
 import django.forms as forms
@@ -128,13 +131,14 @@ class ColumnGroup:
       of the respective `DataNode`.  It must never contain a TAB character
       because this is used as a separator in `OldDataForm`.
 
-    :ivar key_indices: dictionary which maps key names to their index in the
+    :ivar column_indices: sorted indices of the columns of this group in the
       ``columns`` list which is built parallely to the list of
       ``ColumnGroup``.
 
     :type name: str
-    :type key_indices: dict mapping str to int
+    :type column_indices: list of int
     """
+    __slots__ = ("name", "column_indices")
 
     def __init__(self, name):
         """Class constructor.
@@ -143,8 +147,8 @@ class ColumnGroup:
 
         :type name: str
         """
-        self.name = name
-        self.key_indices = {}
+        self.name = sys.intern(name)
+        self.column_indices = []
 
     def __repr__(self):
         return repr(self.name)
@@ -165,17 +169,20 @@ class ColumnGroup:
         """
         return self.name == other.name
 
+    def __hash__(self):
+        return hash(self.name)
+
 
 class Column:
     """Class for one column in the exported table.  The list of ``Column``
     instances is built in `build_column_group_list`.  It contains *all*
     columns, even those that the user doesn't choose for output.  The index in
-    this list is stored in the values of `ColumnGroup.key_indices`.
+    this list is stored in `ColumnGroup.column_indices`.
 
-    :ivar column_group_names: List of names of column groups where one can
-      expect the key–value pairs for this column.
+    :ivar column_group_names: Names of column groups where one can expect the
+      key–value pairs for this column.
 
-      Normally, this list contains exactly *one* item because a column points
+      Normally, this tuple contains exactly *one* item because a column points
       to exactly one particular key in one particular column group.  However in
       case of “shared columns”, this is not so simple anymore.  Then, the value
       is in exactly one of the shared columns, so we have to check all of them
@@ -189,7 +196,12 @@ class Column:
       `key`, however, if this is ambiguous because another key in another
       column groups has the same name, it is made unique by appending ``" {node
       name}"`` to it.
+
+    :type column_group_names: tuple of str
+    :type key: str
+    :type heading: str
     """
+    __slots__ = ("column_group_names", "key", "heading")
 
     def __init__(self, column_group_name, key):
         """Class constructor.
@@ -199,10 +211,10 @@ class Column:
         :param key: the pristine key name this column corresponds to
 
         :type column_group_name: str
-        :type key: str
+        :type key: str or Promise (Django lazy string object)
         """
-        self.column_group_names = [column_group_name]
-        self.key = self.heading = key
+        self.column_group_names = (sys.intern(column_group_name),)
+        self.key = self.heading = sys.intern(str(key))
 
     def append_name(self, column_group_name):
         """Append the name of a column group with a shared key.  If the
@@ -217,7 +229,7 @@ class Column:
 
         :type column_group_name: str
         """
-        self.column_group_names.append(column_group_name)
+        self.column_group_names += (sys.intern(column_group_name),)
 
     def disambig(self):
         """Make the column heading unique.  Normally, the key is used directly
@@ -233,20 +245,50 @@ class Column:
         :param row: the row for which the value in this column should be
             determined
 
-        :type row: dict mapping str to dict mapping str to object
+        :type row: dict mapping (str, str) to object
 
         :return:
-          the cell value of this column in the given row; ``None`` if the
+          the cell value of this column in the given row; ``""`` if the
           respective column group is not available for the given row
 
         :rtype: object
         """
         for column_group_name in self.column_group_names:
-            if column_group_name in row:
-                return row[column_group_name][self.key]
+            cell_key = (column_group_name, self.key)
+            if cell_key in row:
+                return row[cell_key]
         return ""
 
 
+def _make_getter(column):
+    """Create a function which does the same as `Column.get_value` for the
+    given column.  It is specialised for the usual case of a column in only one
+    column group, so that the per-cell work in `iter_table_rows` is reduced to
+    a dictionary lookup.
+
+    :param column: the column the getter is created for
+
+    :type column: `Column`
+
+    :return:
+      function taking a row and returning the cell value of ``column`` in it
+
+    :rtype: function
+    """
+    cell_keys = tuple((column_group_name, column.key) for column_group_name in column.column_group_names)
+    if len(cell_keys) == 1:
+        cell_key = cell_keys[0]
+        def get_value(row):
+            return row.get(cell_key, "")
+    else:
+        def get_value(row):
+            for cell_key in cell_keys:
+                if cell_key in row:
+                    return row[cell_key]
+            return ""
+    return get_value
+
+
 def build_column_group_list(root):
     """Extract from the ``CVSNode`` tree the column group list and the column
     list.  The column group list can be used to show the user the columns in a
@@ -266,26 +308,31 @@ def build_column_group_list(root):
     :rtype: list of `ColumnGroup`, list of `Column`
     """
 
-    def walk_row_tree(node, top_level=True):
-        """Extract all node names from a ``DataNode`` tree.  This routine calls
-        itself recursively to walk through the tree.  Note that the inner order
-        of the nodes (e.g. the chronological order of processes) is preserved
-        by this method.
+    def walk_row_tree(row_tree):
+        """Extract all nodes from a ``DataNode`` tree in pre-order.  Note that
+        the inner order of the nodes (e.g. the chronological order of
+        processes) is preserved by this method.  Additionally, the
+        ``top_level`` attribute of every node is set.
 
-        :param node: the root node of the (sub-)tree to be analysed
+        :param row_tree: the root node of the tree to be analysed
 
-        :type node: `DataNode`
+        :type row_tree: `DataNode`
 
         :return:
-          all node names
+          all nodes
 
-        :rtype: list of str
+        :rtype: list of `DataNode`
         """
-        node.top_level = top_level
-        name_list = [node]
-        for child in node.children:
-            name_list.extend(walk_row_tree(child, top_level=False))
-        return name_list
+        row_tree.top_level = True
+        node_list = []
+        stack = [row_tree]
+        while stack:
+            node = stack.pop()
+            node_list.append(node)
+            for child in node.children:
+                child.top_level = False
+            stack.extend(reversed(node.children))
+        return node_list
 
     def disambig_key_names(columns):
         """Helper function for making all column headings unambiguous.  When
@@ -303,25 +350,19 @@ def build_column_group_list(root):
 
         :type columns: list of `Column`
         """
-        seen = set()
-        duplicates = set()
-        for column in columns:
-            key = column.key
-            if key in seen:
-                duplicates.add(key)
-            else:
-                seen.add(key)
+        key_counts = collections.Counter(column.key for column in columns)
         for column in columns:
-            if column.key in duplicates:
+            if key_counts[column.key] > 1:
                 column.disambig()
     columns = []
     column_groups = []
+    positions = {}
     shared_columns = {}
     position = 0
     for row, row_tree in enumerate(root.children):
         for node in walk_row_tree(row_tree):
-            if row > 0 and node in column_groups:
-                position = column_groups.index(node)
+            if row > 0 and node.name in positions:
+                position = positions[node.name]
             else:
                 name = node.name
                 column_group = ColumnGroup(name)
@@ -330,24 +371,29 @@ def build_column_group_list(root):
                     if node.top_level and item.origin:
                         shared_key = (item.origin, item.key)
                         if shared_key in shared_columns:
-                            column_group.key_indices[item.key] = shared_columns[shared_key]
+                            column_group.column_indices.append(shared_columns[shared_key])
                             columns[shared_columns[shared_key]].append_name(name)
                             continue
                         else:
                             shared_columns[shared_key] = i
-                    column_group.key_indices[item.key] = i
+                    column_group.column_indices.append(i)
                     columns.append(Column(name, item.key))
                     i += 1
+                # Shared columns may point to earlier columns.
+                column_group.column_indices.sort()
                 column_groups.insert(position, column_group)
+                for index in range(position, len(column_groups)):
+                    positions[column_groups[index].name] = index
             position += 1
     disambig_key_names(columns)
     return column_groups, columns
 
 
-def flatten_tree(root):
-    """Walk through a ``DataNode`` tree and convert it to a list of nested
+def iter_flattened_tree(root):
+    """Walk through a ``DataNode`` tree and convert it row by row to flat
     dictionaries for easy cell value lookup.  The resulting data structure is
-    used in :py:meth:`Column.get_value`.
+    used in :py:meth:`Column.get_value`.  Since the rows are generated lazily,
+    only one of them needs to exist at a time when the table is streamed.
 
     :param root: The root node of the ``DataNode`` tree.  It must be a complete
         tree, i.e. the top-level children are considered the row tree.  The
@@ -357,29 +403,45 @@ def flatten_tree(root):
     :type root: `samples.data_tree.DataNode`
 
     :return:
-      list of all rows containg a dictionary mapping node names (loosely
-      corresponding to column group names) to dictionaries mapping key names to
-      cell values
+      all rows, each being a dictionary mapping tuples of node name (loosely
+      corresponding to column group name) and key name to cell values
 
-    :rtype: list of dictionary mapping str to dictionary mapping str to str
+    :rtype: iterator of dictionary mapping (str, str) to object
     """
+    for row_tree in root.children:
+        cells = {}
+        stack = [row_tree]
+        while stack:
+            node = stack.pop()
+            name = sys.intern(node.name)
+            for item in node.items:
+                cells[name, sys.intern(str(item.key))] = item.value if item.value is not None else ""
+            stack.extend(reversed(node.children))
+        yield cells
+
 
-    def flatten_row_tree(node):
-        name_dict = {node.name: {item.key: item.value if item.value is not None else "" for item in node.items}}
-        for child in node.children:
-            name_dict.update(flatten_row_tree(child))
-        return name_dict
+def flatten_tree(root):
+    """Walk through a ``DataNode`` tree and convert it to a list of flat
+    dictionaries.  See `iter_flattened_tree` for the parameters.
 
-    return [flatten_row_tree(row) for row in root.children]
+    :return:
+      list of all rows containg a dictionary mapping tuples of node name
+      (loosely corresponding to column group name) and key name to cell values
 
+    :rtype: list of dictionary mapping (str, str) to object
+    """
+    return list(iter_flattened_tree(root))
 
-def generate_table_rows(flattened_tree, columns, selected_key_indices, label_column, label_column_heading):
-    """Generate the final table suited for CSV export and HTML preview.  Note
-    that for ODF or Excel output, you should also take the column group list
-    into account for better formatting.
+
+def iter_table_rows(flattened_tree, columns, selected_key_indices, label_column, label_column_heading,
+                    include_label_column=None):
+    """Generate the final table suited for CSV export and HTML preview row by
+    row.  This way, the table can be streamed without ever existing as a whole
+    in memory.  Note that for ODF or Excel output, you should also take the
+    column group list into account for better formatting.
 
     :param flattened_tree: the transformed tree as constructed by
-        `flatten_tree`.
+        `flatten_tree` or `iter_flattened_tree`.
     :param columns: list of columns as constructed by `build_column_group_list`
     :param selected_key_indices: list of the column indices which the user
         selected for output
@@ -396,13 +458,44 @@ def generate_table_rows(flattened_tree, columns, selected_key_indices, label_col
         example, for a sample series table, it may be ``"sample"`` because the
         rows are the samples of the series, and their names are printed in the
         first column.
+    :param include_label_column: whether the label column should be generated;
+        if ``None``, this is the case if ``label_column`` contains a non-empty
+        label
 
-    :type flattened_tree: list of dictionary mapping str to dictionary mapping
-      str to str
+    :type flattened_tree: iterable of dictionary mapping (str, str) to object
     :type columns: list of `Column`
     :type selected_key_indices: list of int
     :type label_column: list of str
     :type label_column_heading: str
+    :type include_label_column: bool or NoneType
+
+    :return:
+      The rows of the table, starting with the head row.  Each row is a list
+      of cells.  Each cell is a string.
+
+    :rtype: iterator of list of object
+    """
+    if include_label_column is None:
+        include_label_column = any(label_column)
+    head_row = [label_column_heading] if include_label_column else []
+    selected_columns = [columns[key_index] for key_index in selected_key_indices]
+    head_row.extend([str(column.heading) for column in selected_columns])
+    yield head_row
+    getters = [_make_getter(column) for column in selected_columns]
+    if include_label_column:
+        for label, row in zip(label_column, flattened_tree):
+            table_row = [label]
+            table_row.extend([get_value(row) for get_value in getters])
+            yield table_row
+    else:
+        for row in flattened_tree:
+            yield [get_value(row) for get_value in getters]
+
+
+def generate_table_rows(flattened_tree, columns, selected_key_indices, label_column, label_column_heading,
+                        include_label_column=None):
+    """Generate the final table suited for CSV export and HTML preview.  See
+    `iter_table_rows` for the parameters.
 
     :return:
       The table as a nested list.  The outer list are the rows, the inner the
@@ -410,16 +503,8 @@ def generate_table_rows(flattened_tree, columns, selected_key_indices, label_col
 
     :rtype: list of list of object
     """
-    generate_label_column = any(label_column)
-    head_row = [label_column_heading] if generate_label_column else []
-    head_row.extend([str(columns[key_index].heading) for key_index in selected_key_indices])
-    table_rows = [head_row]
-    for i, row in enumerate(flattened_tree):
-        table_row = [label_column[i]] if generate_label_column else []
-        for key_index in selected_key_indices:
-            table_row.append(columns[key_index].get_value(row))
-        table_rows.append(table_row)
-    return table_rows
+    return list(iter_table_rows(flattened_tree, columns, selected_key_indices, label_column, label_column_heading,
+                                include_label_column))
 
 
 class ColumnGroupsForm(forms.Form):
@@ -431,7 +516,7 @@ class ColumnGroupsForm(forms.Form):
     def __init__(self, column_groups, *args, **kwargs):
         kwargs["prefix"] = kwargs.get("prefix", "") + "__"
         super().__init__(*args, **kwargs)
-        self.fields["column_groups"].choices = ((column_group.name, column_group.name) for column_group in column_groups)
+        self.fields["column_groups"].choices = [(column_group.name, column_group.name) for column_group in column_groups]
         self.fields["column_groups"].widget.attrs["size"] = "10"
 
     def clean_column_groups(self):
@@ -447,9 +532,10 @@ class ColumnsForm(forms.Form):
     def __init__(self, column_groups, columns, selected_column_groups, *args, **kwargs):
         kwargs["prefix"] = kwargs.get("prefix", "") + "__"
         super().__init__(*args, **kwargs)
+        selected_column_groups = frozenset(selected_column_groups)
         self.fields["columns"].choices = \
-            ((column_group.name, [(i, columns[i].key) for i in sorted(column_group.key_indices.values())])
-             for column_group in column_groups if column_group.name in selected_column_groups)
+            [(column_group.name, [(i, columns[i].key) for i in column_group.column_indices])
+             for column_group in column_groups if column_group.name in selected_column_groups]
         self.fields["columns"].widget.attrs["size"] = "10"
 
     def clean_columns(self):
@@ -474,9 +560,9 @@ class OldDataForm(forms.Form):
         kwargs["prefix"] = kwargs.get("prefix", "") + "__old_data"
         super().__init__(*args, **kwargs)
         if "column_groups" in initial:
-            self.fields["column_groups"].initial = "\t".join(column_group for column_group in initial["column_groups"])
+            self.fields["column_groups"].initial = "\t".join(initial["column_groups"])
         if "columns" in initial:
-            self.fields["columns"].initial = " ".join(str(i) for i in initial["columns"])
+            self.fields["columns"].initial = " ".join(map(str, initial["columns"]))
         for fieldname in ["column_groups", "columns"]:
             attributes = self.fields[fieldname].widget.attrs
             if "class" not in attributes:
@@ -487,11 +573,12 @@ class OldDataForm(forms.Form):
                 attributes["class"] += "submit-always"
 
     def clean_column_groups(self):
-        return set(self.cleaned_data["column_groups"].split("\t"))
+        column_groups = self.cleaned_data["column_groups"]
+        return set(column_groups.split("\t")) if column_groups else set()
 
     def clean_columns(self):
         try:
-            return {int(i) for i in self.cleaned_data["columns"].split()}
+            return {int(column) for column in self.cleaned_data["columns"].split()}
         except ValueError:
             # Untranslable because internal anyway
             raise ValidationError("Invalid number in column indices list")
@@ -15,11 +15,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-import copy, datetime
+import datetime
 from django import forms
 from django.contrib.auth.models import User
 from django.forms.utils import ValidationError
-from django.db.models import Q
+from django.db.models import Q, Prefetch
 from django.shortcuts import render, get_object_or_404
 from django.utils.translation import gettext_lazy as _, gettext
 from django.contrib.auth.decorators import login_required
@@ -32,7 +32,7 @@ from django.apps import apps
 import jb_common.utils.base as common_utils
 from jb_common.utils.base import help_link
 from jb_common.models import Department
-from samples.models import Process, Task
+from samples.models import Process, Task, Sample, SampleSeries
 from samples import permissions
 import samples.utils.views as utils
 
@@ -43,16 +43,20 @@ class SamplesForm(forms.Form):
     sample_list = utils.MultipleSamplesField(label=capfirst(_("samples")))
 
     def __init__(self, user, preset_sample, task, data=None, **kwargs):
-        samples = user.my_samples.all()
+        # Topic and series of each sample are needed for the structured
+        # selection list.
+        series_prefetch = Prefetch("series", queryset=SampleSeries.objects.select_related("topic"))
+        samples = user.my_samples.select_related("topic").prefetch_related(series_prefetch)
         important_samples = set()
         if task:
-            kwargs["initial"] = {"sample_list": list(task.samples.values_list("pk", flat=True))}
-            if user != task.customer or task.status != "1 new":
+            task_samples = list(task.samples.select_related("topic").prefetch_related(series_prefetch))
+            kwargs["initial"] = {"sample_list": [sample.pk for sample in task_samples]}
+            if user != task.customer or task.status != Task.Status.NEW:
                 super().__init__(**kwargs)
                 self.fields["sample_list"].disabled = True
             else:
                 super().__init__(data, **kwargs)
-            important_samples.update(task.samples.all())
+            important_samples.update(task_samples)
         else:
             super().__init__(data, **kwargs)
             self.fields["sample_list"].initial = []
@@ -74,40 +78,50 @@ class TaskForm(forms.ModelForm):
         model = Task
         exclude = ("samples",)
 
+    fixed_fields_by_status_and_role = {
+        (Task.Status.NEW, "adder"): frozenset({"process_class", "finished_process"}),
+        (Task.Status.NEW, "other"): frozenset({"process_class", "finished_process", "operator", "status"}),
+        (Task.Status.ACCEPTED, "operator"): frozenset({"process_class"}),
+        (Task.Status.ACCEPTED, "customer"): frozenset({"process_class", "status", "priority", "finished_process", "operator"}),
+        (Task.Status.ACCEPTED, "other"):
+            frozenset({"process_class", "status", "priority", "finished_process", "operator", "comments"}),
+        (Task.Status.IN_PROGRESS, "operator"): frozenset({"process_class"}),
+        (Task.Status.IN_PROGRESS, "customer"): frozenset({"process_class", "status", "priority", "finished_process", "operator"}),
+        (Task.Status.IN_PROGRESS, "other"):
+            frozenset({"process_class", "status", "priority", "finished_process", "operator", "comments"}),
+        (Task.Status.FINISHED, "operator"): frozenset({"process_class", "priority", "finished_process", "operator"}),
+        (Task.Status.FINISHED, "customer"): frozenset({"process_class", "priority", "finished_process", "operator", "status"}),
+        (Task.Status.FINISHED, "other"):
+            frozenset({"process_class", "priority", "finished_process", "operator", "status", "comments"}),
+    }
+    """Fields that the user cannot change, depending on the status of the task
+    and the role of the user for it.  For new tasks, only being an eligible
+    operator (“adder”) matters; else, being the operator takes precedence over
+    being the customer.
+    """
+
     def __init__(self, user, data=None, **kwargs):
         self.task = kwargs.get("instance")
         self.user = user
-        self.fixed_fields = set()
         if self.task:
-            eligible_operators = set(permissions.get_all_adders(self.task.process_class.model_class()))
+            eligible_operators = set(permissions.get_all_adders(self.task.process_class.model_class()).
+                                     only("username", "first_name", "last_name"))
             if self.task.operator:
                 eligible_operators.add(self.task.operator)
-            self.fixed_fields.add("process_class")
-            if self.task.status == "1 new":
-                self.fixed_fields.add("finished_process")
-                if self.user not in eligible_operators:
-                    self.fixed_fields.update(["operator", "status"])
-            elif self.task.status in ["2 accepted", "3 in progress"]:
-                if self.user != self.task.operator:
-                    self.fixed_fields.update(["status", "priority", "finished_process", "operator"])
-                    if self.user != self.task.customer:
-                        self.fixed_fields.add("comments")
+            if self.task.status == Task.Status.NEW:
+                role = "adder" if self.user in eligible_operators else "other"
+            elif self.user == self.task.operator:
+                role = "operator"
+            elif self.user == self.task.customer:
+                role = "customer"
             else:
-                self.fixed_fields.update(["priority", "finished_process", "operator"])
-                if self.user != self.task.operator:
-                    self.fixed_fields.add("status")
-                    if self.user != self.task.customer:
-                        self.fixed_fields.add("comments")
+                role = "other"
+            self.fixed_fields = self.fixed_fields_by_status_and_role[self.task.status, role]
         else:
-            self.fixed_fields.update(["status", "finished_process", "operator"])
-        if data is not None:
-            data = data.copy()
-            if self.task:
-                data.update(forms.model_to_dict(self.task, self.fixed_fields))
-            else:
-                initial = kwargs.get("initial", {})
-                initial.update({"status": "1 new"})
-                data.update(initial)
+            self.fixed_fields = frozenset({"status", "finished_process", "operator"})
+        # The fixed fields are disabled below, so Django takes their values from
+        # ``initial`` instead of ``data``.  Therefore, the POST data needs no
+        # overriding (nor copying).
         super().__init__(data, **kwargs)
         self.fields["customer"].required = False
         self.fields["operator"].choices = [("", "---------")]
@@ -124,7 +138,8 @@ class TaskForm(forms.ModelForm):
                     [(process.id, process.actual_instance)
                      for process in Process.objects.filter(
                             Q(operator=self.user, content_type=self.task.process_class) |
-                            Q(id=old_finished_process_id)).filter(finished=True).order_by("-timestamp")[:10]])
+                            Q(id=old_finished_process_id)).filter(finished=True).order_by("-timestamp").
+                     prefetch_related("actual_instance")[:10]])
             elif old_finished_process_id:
                 self.fields["finished_process"].choices.append((old_finished_process_id, self.task.finished_process))
         self.fields["comments"].widget.attrs["cols"] = 30
@@ -135,7 +150,7 @@ class TaskForm(forms.ModelForm):
 
     def clean_status(self):
         if "status" in self.fixed_fields:
-            return self.task.status if self.task else "1 new"
+            return self.task.status if self.task else Task.Status.NEW
         return self.cleaned_data["status"]
 
     def clean_process_class(self):
@@ -174,7 +189,7 @@ class TaskForm(forms.ModelForm):
 
     def clean(self):
         cleaned_data = super().clean()
-        if cleaned_data.get("status") in ["2 accepted", "3 in progress", "0 finished"]:
+        if cleaned_data.get("status") in [Task.Status.ACCEPTED, Task.Status.IN_PROGRESS, Task.Status.FINISHED]:
             if not cleaned_data.get("operator"):
                 self.add_error("operator", ValidationError(_("With this status, you must set an operator."), code="required"))
         return cleaned_data
@@ -185,20 +200,31 @@ class ChooseTaskListsForm(forms.Form):
     """
     visible_task_lists = forms.MultipleChoiceField(label=capfirst(_("show task lists for")), required=False)
 
-    def __init__(self, user, data=None, **kwargs):
+    def __init__(self, user, visible_task_lists, data=None, **kwargs):
+        """
+        :param user: the currently logged-in user
+        :param visible_task_lists: the content types of the task lists the user
+            currently sees
+        :param data: the POST data, if any
+
+        :type user: django.contrib.auth.models.User
+        :type visible_task_lists: list of ``ContentType``
+        :type data: QueryDict
+        """
         super().__init__(data, **kwargs)
+        processes_by_app_label = {}
+        for process in permissions.get_all_addable_physical_process_models():
+            processes_by_app_label.setdefault(process._meta.app_label, set()).add(process)
         choices = []
         for department in user.samples_user_details.show_users_from_departments.iterator():
-            process_from_department = {process for process in permissions.get_all_addable_physical_process_models().keys()
-                                       if process._meta.app_label == department.app_label}
-            choices.append((department.name, utils.choices_of_content_types(process_from_department)))
+            choices.append((department.name,
+                            utils.choices_of_content_types(processes_by_app_label.get(department.app_label, ()))))
         if len(choices) == 1:
             choices = choices[0][1]
         if not choices:
             choices = (("", 9 * "-"),)
         self.fields["visible_task_lists"].choices = choices
-        self.fields["visible_task_lists"].initial = [content_type.id for content_type
-                                                     in user.samples_user_details.visible_task_lists.iterator()]
+        self.fields["visible_task_lists"].initial = [content_type.id for content_type in visible_task_lists]
         self.fields["visible_task_lists"].widget.attrs["size"] = "15"
 
 
@@ -207,31 +233,44 @@ class TaskForTemplate:
     """
     def __init__(self, task, user):
         self.task = task
-        self.samples = [sample if (sample.topic and not sample.topic.confidential)
-                        or (permissions.has_permission_to_fully_view_sample(user, sample) or
-                            permissions.has_permission_to_add_edit_physical_process(user, self.task.finished_process,
-                                                                                    self.task.process_class.model_class()))
-                        else _("confidential sample") for sample in self.task.samples.all()]
+        process_class = task.process_class.model_class()
+        samples = list(task.samples.all())
+        self.samples = []
+        can_fully_view = {}
+        def can_fully_view_sample(sample):
+            try:
+                return can_fully_view[sample.pk]
+            except KeyError:
+                result = can_fully_view[sample.pk] = permissions.has_permission_to_fully_view_sample(user, sample)
+                return result
+        # Whether the user can add or edit the process doesn't depend on the
+        # sample, so it is determined only once, and only if necessary.
+        user_can_add_edit_process = None
+        for sample in samples:
+            if not (sample.topic and not sample.topic.confidential) and not can_fully_view_sample(sample):
+                if user_can_add_edit_process is None:
+                    user_can_add_edit_process = permissions.has_permission_to_add_edit_physical_process(
+                        user, self.task.finished_process, process_class)
+                if not user_can_add_edit_process:
+                    sample = _("confidential sample")
+            self.samples.append(sample)
         self.user_can_edit = user == self.task.customer or \
-            permissions.has_permission_to_add_physical_process(user, task.process_class.model_class())
+            permissions.has_permission_to_add_physical_process(user, process_class)
         self.user_can_see_everything = self.user_can_edit or \
-            all([permissions.has_permission_to_fully_view_sample(user, sample) for sample in self.task.samples.all()])
+            all(can_fully_view_sample(sample) for sample in samples)
         self.user_can_delete = user == self.task.customer
 
 
-def save_to_database(task_form, samples_form, old_task):
+def save_to_database(task_form, samples_form):
     """Saves the data for a task into the database.  All validation checks
     must have done before calling this function.
 
     :param task_form: a bound and valid task form
     :param samples_form: a bound and valid samples form iff we create a new
         task, or an unbound samples form
-    :param old_task: the old task instance, which is ``None`` if we newly create
-        one
 
     :type task_form: `TaskForm`
     :type samples_form: `SamplesForm`
-    :type old_task: `samples.models.Task`
 
     :return:
      the saved task database object.
@@ -241,7 +280,7 @@ def save_to_database(task_form, samples_form, old_task):
     task = task_form.save()
     if samples_form.is_bound:
         task.samples.set(samples_form.cleaned_data["sample_list"])
-    if old_task and task.operator and old_task.operator != task.operator:
+    if task.operator and task_form.initial.get("operator") != task.operator_id:
         task.operator.my_samples.add(*task.samples.all())
     return task
 
@@ -271,30 +310,31 @@ def edit(request, task_id):
     if request.method == "POST":
         task_form = TaskForm(user, request.POST, instance=task)
         samples_form = SamplesForm(user, preset_sample, task, request.POST)
-        if task_id:
-            old_task = copy.deepcopy(task)
-            old_samples = set(task.samples.all())
         if task_form.is_valid() and (not samples_form.is_bound or samples_form.is_valid()):
-            task = save_to_database(task_form, samples_form, old_task=old_task if task_id else None)
+            task = save_to_database(task_form, samples_form)
             if task_id:
+                # ``initial`` still holds the field values of the task before
+                # saving.
+                old_values = task_form.initial
                 edit_description = {"important": True, "description": ""}
-                if old_task.status != task.status:
+                if old_values["status"] != task.status:
                     edit_description["description"] += \
                         _("* Status is now “{new_status}”.\n").format(new_status=task.get_status_display())
-                if old_task.priority != task.priority:
+                if old_values["priority"] != task.priority:
                     edit_description["description"] += \
                         _("* Priority is now “{new_priority}̣”.\n").format(new_priority=task.get_priority_display())
-                if old_task.finished_process != task.finished_process:
+                if old_values["finished_process"] != task.finished_process_id:
                     edit_description["description"] += _("* Connected process.\n")
-                if old_task.operator != task.operator:
+                if old_values["operator"] != task.operator_id:
                     if task.operator:
                         edit_description["description"] += _("* Operator is now {operator}.\n").format(
                             operator=common_utils.get_really_full_name(task.operator))
                     else:
                         edit_description["description"] += _("* No operator is set anymore.\n")
-                if old_samples != set(task.samples.all()):
+                if samples_form.is_bound and set(samples_form.initial["sample_list"]) != \
+                        {sample.pk for sample in samples_form.cleaned_data["sample_list"]}:
                     edit_description["description"] += "* {0}.\n".format(common_utils.capitalize_first_letter(_("samples")))
-                if old_task.comments != task.comments:
+                if old_values["comments"] != task.comments:
                     edit_description["description"] += "* {0}.\n".format(common_utils.capitalize_first_letter(_("comments")))
             else:
                 edit_description = None
@@ -311,13 +351,16 @@ def edit(request, task_id):
     return render(request, "samples/edit_task.html", {"title": title, "task": task_form, "samples": samples_form})
 
 
-def create_task_lists(user):
+def create_task_lists(user, visible_task_lists):
     """Create the datastructure containing the tasks associated with a user.  This
     can be used in the template to create a nested overview of the tasks.
 
     :param user: the user for which the tasks should be generated
+    :param visible_task_lists: the content types of the task lists the user
+        wants to see
 
     :type user: ``django.contrib.auth.models.User``
+    :type visible_task_lists: list of ``ContentType``
 
     :return:
       the tasks as list of (content type, verbose name, list of task info
@@ -325,23 +368,33 @@ def create_task_lists(user):
 
     :rtype: list of (``ContentType``, str, `TaskForTemplate`)
     """
+    department_names = {}
     def get_department_name_of_type(content_type):
         # FixMe: It is possible that some processes are in more than one
         # department available.  Maybe we need a better way to determine the
         # department.
-        app_label = content_type.model_class()._meta.app_label
-        department_names = set(Department.objects.filter(app_label=app_label).values_list("name", flat=True))
-        assert len(department_names) == 1
-        return department_names.pop()
+        if not department_names:
+            for app_label, name in Department.objects.values_list("app_label", "name"):
+                department_names.setdefault(app_label, set()).add(name)
+        names = department_names.get(content_type.model_class()._meta.app_label, ())
+        assert len(names) == 1
+        return next(iter(names))
     one_week_ago = django.utils.timezone.now() - datetime.timedelta(weeks=1)
+    active_tasks = {}
+    for task in Task.objects.filter(process_class__in=visible_task_lists). \
+            exclude(Q(status=Task.Status.FINISHED) & Q(last_modified__lt=one_week_ago)). \
+            order_by("-status", "priority", "last_modified"). \
+            select_related("customer__jb_user_details__department", "operator__jb_user_details__department",
+                           "finished_process", "process_class"). \
+            prefetch_related(Prefetch("samples", queryset=Sample.objects.select_related(
+                "topic", "currently_responsible_person__jb_user_details__department"))):
+        active_tasks.setdefault(task.process_class_id, []).append(TaskForTemplate(task, user))
     task_lists = []
     seen_process_names = set()
     ambiguous_process_names = set()
-    for process_content_type in user.samples_user_details.visible_task_lists.all():
+    for process_content_type in visible_task_lists:
         process_name = capfirst(force_str(process_content_type.model_class()._meta.verbose_name))
-        active_tasks = process_content_type.tasks.order_by("-status", "priority", "last_modified"). \
-            exclude(Q(status="0 finished") & Q(last_modified__lt=one_week_ago))
-        task_lists.append((process_name, process_content_type, [TaskForTemplate(task, user) for task in active_tasks]))
+        task_lists.append((process_name, process_content_type, active_tasks.get(process_content_type.id, [])))
         if process_name in seen_process_names:
             ambiguous_process_names.add(process_name)
         else:
@@ -370,17 +423,17 @@ def show(request):
 
     :rtype: HttpResponse
     """
+    visible_task_lists = list(request.user.samples_user_details.visible_task_lists.all())
     if request.method == "POST":
-        choose_task_lists_form = ChooseTaskListsForm(request.user, request.POST)
+        choose_task_lists_form = ChooseTaskListsForm(request.user, visible_task_lists, request.POST)
         if choose_task_lists_form.is_valid():
             request.user.samples_user_details.visible_task_lists.set(
-                [ContentType.objects.get_for_id(int(id_))
-                 for id_ in choose_task_lists_form.cleaned_data["visible_task_lists"] if id_])
+                {int(id_) for id_ in choose_task_lists_form.cleaned_data["visible_task_lists"] if id_})
             # In order to have a GET instead of a POST as the last request
             return utils.successful_response(request, view="samples:show_task_lists")
     else:
-        choose_task_lists_form = ChooseTaskListsForm(request.user)
-    task_lists = create_task_lists(request.user)
+        choose_task_lists_form = ChooseTaskListsForm(request.user, visible_task_lists)
+    task_lists = create_task_lists(request.user, visible_task_lists)
     return render(request, "samples/task_lists.html", {"title": capfirst(_("task lists")),
                                                        "choose_task_lists": choose_task_lists_form,
                                                        "task_lists": task_lists})
@@ -400,7 +453,7 @@ def remove(request, task_id):
 
     :rtype: HttpResponse
     """
-    task = get_object_or_404(Task, id=utils.convert_id_to_int(task_id))
+    task = get_object_or_404(Task.objects.select_related("customer", "process_class"), id=utils.convert_id_to_int(task_id))
     if task.customer != request.user:
         raise permissions.PermissionError(request.user, _("You are not the customer of this task."))
     utils.Reporter(request.user).report_removed_task(task)
@@ -232,6 +232,7 @@ def edit(request, id):
             topic.members.set(new_members)
             topic.confidential = edit_topic_form.cleaned_data["confidential"]
             topic.save()
+            permissions.forget_topic_ids(request.user)
             if old_manager != new_manager:
                 topic_manager_permission = permissions.get_topic_manager_permission()
                 if not old_manager.managed_topics.all():